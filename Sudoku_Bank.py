@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:12:26 2026
+
+Packed binary puzzle bank with memory mapped random access
+
+Bank file: a 16 byte header followed by fixed size 64 byte records.
+
+    Record layout (little endian)
+      difficulty   u8   index into DIFFICULTIES
+      clues        u8   number of givens
+      rating       u8   grade rating * 10, 0 if not graded
+      id_info      u8   0 without an ID, else (generator version << 2) | ID difficulty
+      seed         u64  seed of the puzzle ID
+      solution     41 bytes, 4 bits per cell
+      givens       11 bytes, bit i set when cell i is shown
+
+Index file (<bank>.idx): records sorted by difficulty then clue count, with a
+table of (difficulty, clues) buckets. Every difficulty (and clue range within it)
+is one contiguous run of the index, so a random puzzle is one lookup.
+
+@author: Jack Rawlinson
+"""
+
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from Sudoku_Engine import DIFFICULTIES, ID_DIFFICULTIES, Sudoku_Puzzle, parse_puzzle_id, puzzle_id
+
+BANK_MAGIC = b"SDKBANK1"
+INDEX_MAGIC = b"SDKINDX1"
+# Bank header: magic, format version, record size, reserved
+BANK_HEADER = struct.Struct("<8sHHI")
+# Record header before the packed cells
+RECORD_HEADER = struct.Struct("<BBBBQ")
+RECORD_SIZE = 64
+# Index header: magic, records indexed, number of buckets
+INDEX_HEADER = struct.Struct("<8sII")
+# Index bucket: difficulty, clues, first position, number of records
+INDEX_BUCKET = struct.Struct("<BBxxII")
+# numpy view of a record, used to build the index without decoding records
+RECORD_DTYPE = np.dtype([("difficulty", "u1"), ("clues", "u1"), ("rating", "u1"),
+                         ("id_info", "u1"), ("seed", "<u8"), ("cells", "V52")])
+# Letters of ID difficulties, in the order stored in id_info
+ID_LETTERS = tuple(ID_DIFFICULTIES)
+
+
+def pack_record(puzzle, difficulty):
+    """
+    Packs one difficulty of a puzzle into a 64 byte record
+
+    Parameters
+    ----------
+    puzzle : Sudoku_Puzzle
+      Puzzle to store.
+    difficulty : String
+      Which of the puzzle's grids to store.
+
+    Returns
+    -------
+    record : bytes
+      RECORD_SIZE bytes.
+
+    """
+    grid = puzzle.grids[difficulty]
+    givens = 0
+    for index, number in enumerate(grid):
+        if number:
+            givens |= 1 << index
+    grade = puzzle.grades.get(difficulty)
+    rating = round(grade.rating * 10) if grade else 0
+    id_info = 0
+    seed = 0
+    if puzzle.id:
+        version, seed, id_difficulty = parse_puzzle_id(puzzle.id)
+        id_info = (version << 2) | ID_LETTERS.index(id_difficulty)
+    cells = bytes(puzzle.solution) + b"\0"
+    packed = bytes((cells[index] << 4) | cells[index + 1] for index in range(0, 82, 2))
+    return (RECORD_HEADER.pack(DIFFICULTIES.index(difficulty), bin(givens).count("1"),
+                               rating, id_info, seed)
+            + packed + givens.to_bytes(11, "little"))
+
+
+def unpack_record(record):
+    """
+    Rebuilds the puzzle stored in a record
+
+    Parameters
+    ----------
+    record : bytes-like
+      RECORD_SIZE bytes made by pack_record.
+
+    Returns
+    -------
+    puzzle : Sudoku_Puzzle
+      Puzzle with only the stored difficulty's grid, and its ID if it had one.
+    difficulty : String
+      Difficulty of the stored grid.
+
+    """
+    difficulty, clues, rating, id_info, seed = RECORD_HEADER.unpack_from(record)
+    packed = record[RECORD_HEADER.size:RECORD_HEADER.size + 41]
+    solution = bytearray(82)
+    solution[0::2] = bytes(byte >> 4 for byte in packed)
+    solution[1::2] = bytes(byte & 0xF for byte in packed)
+    solution = bytes(solution[:81])
+    givens = int.from_bytes(record[RECORD_HEADER.size + 41:RECORD_SIZE], "little")
+    grid = bytes(number if givens >> index & 1 else 0 for index, number in enumerate(solution))
+    difficulty = DIFFICULTIES[difficulty]
+    puzzle = Sudoku_Puzzle(solution, {difficulty: grid})
+    if id_info:
+        puzzle.id = puzzle_id(seed, ID_LETTERS[id_info & 3], id_info >> 2)
+    return puzzle, difficulty
+
+
+class Bank_Writer:
+    """
+    Append only writer, puzzles can be streamed in as they are generated
+    """
+
+    def __init__(self, path, buffer_records=4096):
+        """
+        Parameters
+        ----------
+        path : String
+          Bank file, created if it does not exist.
+        buffer_records : Int, optional
+          Records collected in memory before each write.
+
+        """
+        self.path = path
+        self.buffer = bytearray()
+        self.buffer_records = buffer_records
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(BANK_HEADER.pack(BANK_MAGIC, 1, RECORD_SIZE, 0))
+        else:
+            check_header(path)
+
+    def append(self, puzzle, difficulty):
+        """
+        Adds one difficulty of a puzzle to the end of the bank
+
+        Parameters
+        ----------
+        puzzle : Sudoku_Puzzle
+          Puzzle to store.
+        difficulty : String
+          Which of the puzzle's grids to store.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.buffer += pack_record(puzzle, difficulty)
+        if len(self.buffer) >= self.buffer_records * RECORD_SIZE:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes buffered records to disk
+        """
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        """
+        Writes what is left and rebuilds the index so the new records can be picked
+        """
+        self.flush()
+        self.file.close()
+        build_index(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def check_header(path):
+    """
+    Raises ValueError if path is not a bank file this code can read
+    """
+    with open(path, "rb") as file:
+        header = file.read(BANK_HEADER.size)
+    if len(header) < BANK_HEADER.size:
+        raise ValueError(f'{path} is not a puzzle bank')
+    magic, version, record_size, _ = BANK_HEADER.unpack(header)
+    if magic != BANK_MAGIC or version != 1 or record_size != RECORD_SIZE:
+        raise ValueError(f'{path} is not a version 1 puzzle bank')
+
+
+def build_index(path):
+    """
+    Writes <path>.idx, grouping the records by difficulty and clue count
+
+    Parameters
+    ----------
+    path : String
+      Bank file.
+
+    Returns
+    -------
+    None.
+
+    """
+    check_header(path)
+    count = (os.path.getsize(path) - BANK_HEADER.size) // RECORD_SIZE
+    records = np.fromfile(path, dtype=RECORD_DTYPE, count=count, offset=BANK_HEADER.size)
+    keys = records["difficulty"].astype(np.uint32) * 256 + records["clues"]
+    order = np.argsort(keys, kind="stable").astype("<u4")
+    bucket_keys, starts, sizes = np.unique(keys[order], return_index=True, return_counts=True)
+
+    temporary = path + ".idx.tmp"
+    with open(temporary, "wb") as file:
+        file.write(INDEX_HEADER.pack(INDEX_MAGIC, count, len(bucket_keys)))
+        for key, start, size in zip(bucket_keys.tolist(), starts.tolist(), sizes.tolist()):
+            file.write(INDEX_BUCKET.pack(key >> 8, key & 0xFF, start, size))
+        file.write(order.tobytes())
+    os.replace(temporary, path + ".idx")
+
+
+class Puzzle_Bank:
+    """
+    Read only, memory mapped view of a bank and its index
+    """
+
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : String
+          Bank file. Its index is built first if missing.
+
+        """
+        check_header(path)
+        if not os.path.exists(path + ".idx"):
+            build_index(path)
+        with open(path, "rb") as file:
+            self.bank = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(path + ".idx", "rb") as file:
+            self.index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.indexed, bucket_count = INDEX_HEADER.unpack_from(self.index)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f'{path}.idx is not a puzzle bank index')
+        # (difficulty, clues) -> (first position, count), small enough to keep in memory
+        self.buckets = {}
+        for bucket in range(bucket_count):
+            difficulty, clues, start, size = INDEX_BUCKET.unpack_from(
+                self.index, INDEX_HEADER.size + bucket * INDEX_BUCKET.size)
+            self.buckets[DIFFICULTIES[difficulty], clues] = (start, size)
+        self.order_offset = INDEX_HEADER.size + bucket_count * INDEX_BUCKET.size
+
+    def __len__(self):
+        return (len(self.bank) - BANK_HEADER.size) // RECORD_SIZE
+
+    def __getitem__(self, number):
+        """
+        Puzzle and difficulty of record number, see unpack_record
+        """
+        if not 0 <= number < len(self):
+            raise IndexError(number)
+        offset = BANK_HEADER.size + number * RECORD_SIZE
+        return unpack_record(self.bank[offset:offset + RECORD_SIZE])
+
+    def span(self, difficulty, min_clues=0, max_clues=81):
+        """
+        Range of index positions holding a difficulty within a clue range
+
+        Returns
+        -------
+        start, end : Int
+          Records at index positions start to end - 1 match.
+
+        """
+        matches = [bucket for key, bucket in self.buckets.items()
+                   if key[0] == difficulty and min_clues <= key[1] <= max_clues]
+        if not matches:
+            return 0, 0
+        return min(start for start, _ in matches), max(start + size for start, size in matches)
+
+    def count(self, difficulty, min_clues=0, max_clues=81):
+        """
+        Number of indexed puzzles of a difficulty within a clue range
+        """
+        start, end = self.span(difficulty, min_clues, max_clues)
+        return end - start
+
+    def random(self, difficulty, rng=None, min_clues=0, max_clues=81):
+        """
+        Picks a random puzzle of a difficulty without reading the rest of the bank
+
+        Parameters
+        ----------
+        difficulty : String
+          One of DIFFICULTIES.
+        rng : numpy Generator, optional
+          Source of the random choice.
+        min_clues, max_clues : Int, optional
+          Only pick puzzles with a clue count in this range.
+
+        Returns
+        -------
+        puzzle : Sudoku_Puzzle
+          Puzzle with only the grid of the requested difficulty.
+
+        """
+        start, end = self.span(difficulty, min_clues, max_clues)
+        if start == end:
+            raise LookupError(f'No {difficulty} puzzles with {min_clues}-{max_clues} clues in the bank')
+        rng = np.random.default_rng() if rng is None else rng
+        position = int(rng.integers(start, end))
+        number, = struct.unpack_from("<I", self.index, self.order_offset + position * 4)
+        return self[number][0]
+
+    def close(self):
+        """
+        Releases the memory maps
+        """
+        self.bank.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
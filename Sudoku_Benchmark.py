@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:30:02 2026
+
+Benchmark for the headless generator
+
+Runs the engine for a number of grids with fixed seeds and reports throughput,
+latency percentiles, backtrack/restart counts and peak memory as JSON, so runs
+on different commits can be compared, e.g.
+
+    python -m Sudoku_Benchmark --count 200 --json before.json
+    python -m Sudoku_Benchmark --count 200 --compare before.json
+
+--box-sizes 2 3 4 5 adds how fill and dig times grow from 4x4 to 25x25 boards.
+
+@author: Jack Rawlinson
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from Sudoku_Engine import GENERATOR_VERSION, Sudoku_Engine, parse_difficulty
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak memory is then left out
+    resource = None
+
+
+def latency_summary(seconds):
+    """
+    Mean, percentiles and maximum of a list of durations
+
+    Parameters
+    ----------
+    seconds : List of floats
+      Durations in seconds.
+
+    Returns
+    -------
+    summary : Dict
+      Values in milliseconds.
+
+    """
+    milliseconds = np.array(seconds) * 1000
+    p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+    return {"mean_ms": float(milliseconds.mean()), "p50_ms": float(p50), "p95_ms": float(p95),
+            "p99_ms": float(p99), "max_ms": float(milliseconds.max())}
+
+
+def count_summary(counts):
+    """
+    Total, mean and maximum of per grid counts
+    """
+    return {"total": int(sum(counts)), "mean": float(np.mean(counts)), "max": int(max(counts))}
+
+
+def peak_memory_kb():
+    """
+    Peak resident memory of this process in KB, None where it can't be read
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_benchmark(count, seed=0, difficulty=None):
+    """
+    Generates count puzzles one by one, grid i seeded with seed + i
+
+    Parameters
+    ----------
+    count : Int
+      Number of puzzles.
+    seed : Int, optional
+      Seed of the first grid.
+    difficulty : String, optional
+      Passed on to Sudoku_Engine.generate. Without it each grid is filled and
+      dug once, so the fill and dig phases can be timed separately.
+
+    Returns
+    -------
+    report : Dict
+      Machine readable results.
+
+    """
+    fill_times = []
+    dig_times = []
+    total_times = []
+    backtracks = []
+    restarts = []
+    start = time.perf_counter()
+    for grid in range(count):
+        engine = Sudoku_Engine(np.random.default_rng(seed + grid))
+        grid_start = time.perf_counter()
+        if difficulty is None:
+            engine.complete_grid_generator()
+            fill_end = time.perf_counter()
+            engine.solvable_grid()
+            fill_times.append(fill_end - grid_start)
+            dig_times.append(time.perf_counter() - fill_end)
+        else:
+            engine.generate(difficulty)
+        total_times.append(time.perf_counter() - grid_start)
+        backtracks.append(engine.stats["backtracks"])
+        restarts.append(engine.stats["restarts"])
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "generator_version": GENERATOR_VERSION,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "count": count,
+        "seed": seed,
+        "difficulty": difficulty,
+        "seconds": elapsed,
+        "grids_per_second": count / elapsed,
+        "latency": {"total": latency_summary(total_times)},
+        # Backtracks and restarts of the last fill of each grid
+        "backtracks": count_summary(backtracks),
+        "restarts": count_summary(restarts),
+        "peak_memory_kb": peak_memory_kb(),
+    }
+    if fill_times:
+        report["latency"]["fill"] = latency_summary(fill_times)
+        report["latency"]["dig"] = latency_summary(dig_times)
+    return report
+
+
+def run_scaling(box_sizes, count, seed=0):
+    """
+    Times the fill and dig phases for each board size, grid i seeded with seed + i
+
+    Parameters
+    ----------
+    box_sizes : List of ints
+      Box sizes to time, e.g. [2, 3, 4, 5] for 4x4 to 25x25.
+    count : Int
+      Grids per size.
+    seed : Int, optional
+      Seed of the first grid of every size.
+
+    Returns
+    -------
+    scaling : Dict
+      Maps "<N>x<N>" to fill and dig latencies and the Hard grids' clue counts.
+
+    """
+    scaling = {}
+    for box in box_sizes:
+        fill_times = []
+        dig_times = []
+        clues = []
+        for grid in range(count):
+            engine = Sudoku_Engine(np.random.default_rng(seed + grid), box=box)
+            start = time.perf_counter()
+            engine.complete_grid_generator()
+            fill_end = time.perf_counter()
+            engine.solvable_grid()
+            fill_times.append(fill_end - start)
+            dig_times.append(time.perf_counter() - fill_end)
+            clues.append(engine.filled_cells)
+        size = box * box
+        scaling[f'{size}x{size}'] = {"fill": latency_summary(fill_times),
+                                     "dig": latency_summary(dig_times),
+                                     "clues": count_summary(clues)}
+    return scaling
+
+
+def compare(report, baseline, tolerance):
+    """
+    Lists the ways report is worse than baseline by more than tolerance
+
+    Parameters
+    ----------
+    report, baseline : Dict
+      Results of run_benchmark.
+    tolerance : Float
+      Allowed relative change, e.g. 0.1 for 10 %.
+
+    Returns
+    -------
+    regressions : List of strings
+      One message per regression, empty if there are none.
+
+    """
+    regressions = []
+    if report["grids_per_second"] < baseline["grids_per_second"] * (1 - tolerance):
+        regressions.append(f'throughput {report["grids_per_second"]:.1f} grids/s, '
+                           f'was {baseline["grids_per_second"]:.1f}')
+    for phase, latency in report["latency"].items():
+        if phase not in baseline["latency"]:
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            old = baseline["latency"][phase][key]
+            if latency[key] > old * (1 + tolerance):
+                regressions.append(f'{phase} {key} {latency[key]:.2f}, was {old:.2f}')
+    for board, phases in report.get("scaling", {}).items():
+        if board not in baseline.get("scaling", {}):
+            continue
+        for phase in ("fill", "dig"):
+            old = baseline["scaling"][board][phase]["p50_ms"]
+            if phases[phase]["p50_ms"] > old * (1 + tolerance):
+                regressions.append(f'{board} {phase} p50_ms {phases[phase]["p50_ms"]:.2f}, '
+                                   f'was {old:.2f}')
+    return regressions
+
+
+def main(argv=None):
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(prog="Sudoku_Benchmark",
+                                     description="Benchmark the headless sudoku generator")
+    parser.add_argument("--count", type=int, default=100, help="Number of grids")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first grid")
+    parser.add_argument("--difficulty", type=parse_difficulty, default=None,
+                        help="Time generate(difficulty) instead of one fill and dig")
+    parser.add_argument("--json", default=None, help="Also write the report to this file")
+    parser.add_argument("--compare", default=None,
+                        help="Earlier report to compare against, exits 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Relative slowdown allowed by --compare")
+    parser.add_argument("--box-sizes", type=int, nargs="+", default=None,
+                        choices=range(2, 6), metavar="BOX",
+                        help="Also time boards of these box sizes, e.g. 2 3 4 5")
+    parser.add_argument("--scaling-count", type=int, default=5,
+                        help="Grids per board size for --box-sizes")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.count, args.seed, args.difficulty)
+    if args.box_sizes:
+        report["scaling"] = run_scaling(args.box_sizes, args.scaling_count, args.seed)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json:
+        with open(args.json, "w") as file:
+            file.write(text + "\n")
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as file:
+            regressions += compare(report, json.load(file), args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION: {regression}', file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 09:18:35 2026
+
+Compact immutable board value
+
+A Board keeps its cells in one bytes object (81 bytes for 9x9) plus an int
+bitmask of the given clues, so millions fit in memory, equal boards hash alike
+for deduplication in sets and dicts, and pickling one for another process
+sends little more than the bytes. numpy is only loaded by Board.array, which
+views the bytes without copying them.
+
+@author: Jack Rawlinson
+"""
+
+from Sudoku_Format import LINE_BOX_SIZES, grid_to_line, line_to_grid
+
+
+class Board:
+    """
+    Cell values of a board and which of them are given clues
+    """
+
+    __slots__ = ("cells", "givens", "hash")
+
+    def __init__(self, cells, givens=None):
+        """
+        Parameters
+        ----------
+        cells : bytes-like or sequence of ints
+          Cell values in row order, 0 for an empty cell. 81 cells for 9x9,
+          or 16, 256 or 625 for other box sizes.
+        givens : Int, optional
+          Bitmask with bit i set when cell i is a given clue, every filled
+          cell when not given.
+
+        Raises
+        ------
+        ValueError
+          If the number of cells or a value does not fit a board.
+
+        """
+        cells = bytes(cells)
+        if len(cells) not in LINE_BOX_SIZES:
+            raise ValueError(f'A board has 16, 81, 256 or 625 cells, not {len(cells)}')
+        if max(cells) > LINE_BOX_SIZES[len(cells)] ** 2:
+            raise ValueError(f'Cell values must be 0-{LINE_BOX_SIZES[len(cells)] ** 2}')
+        if givens is None:
+            givens = 0
+            for index, number in enumerate(cells):
+                if number:
+                    givens |= 1 << index
+        elif givens >> len(cells):
+            raise ValueError("Givens mask has bits beyond the last cell")
+        object.__setattr__(self, "cells", cells)
+        object.__setattr__(self, "givens", givens)
+        object.__setattr__(self, "hash", hash((cells, givens)))
+
+    @classmethod
+    def from_line(cls, line):
+        """
+        Board of a puzzle line, every filled cell is a given clue
+        """
+        return cls(line_to_grid(line))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Board is immutable, use with_cell for a changed copy")
+
+    def __delattr__(self, name):
+        raise AttributeError("Board is immutable")
+
+    def __reduce__(self):
+        # Only the bytes and the mask are pickled, the hash is recomputed
+        return (Board, (self.cells, self.givens))
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self.hash == other.hash and self.cells == other.cells and self.givens == other.givens
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def __str__(self):
+        return grid_to_line(self.cells)
+
+    def __repr__(self):
+        return f'Board.from_line({str(self)!r})' if self.givens == self.filled_mask() \
+            else f'Board({self.cells!r}, givens={self.givens:#x})'
+
+    @property
+    def size(self):
+        """
+        Number of rows, e.g. 9
+        """
+        return LINE_BOX_SIZES[len(self.cells)] ** 2
+
+    @property
+    def clues(self):
+        """
+        Number of given clues
+        """
+        return bin(self.givens).count("1")
+
+    def filled_mask(self):
+        """
+        Bitmask of the filled cells, given or not
+        """
+        mask = 0
+        for index, number in enumerate(self.cells):
+            if number:
+                mask |= 1 << index
+        return mask
+
+    def is_given(self, index):
+        """
+        True if a cell holds a given clue
+        """
+        return bool(self.givens >> index & 1)
+
+    def puzzle(self):
+        """
+        Board of the given clues alone, e.g. to start a board over
+        """
+        return Board(bytes(number if self.givens >> index & 1 else 0
+                           for index, number in enumerate(self.cells)), self.givens)
+
+    def with_cell(self, index, number):
+        """
+        Copy of the board with one cell changed, given clues can't be changed
+
+        Raises
+        ------
+        ValueError
+          If the cell is a given clue.
+
+        """
+        if self.givens >> index & 1:
+            raise ValueError(f'Cell {index} is a given clue')
+        cells = bytearray(self.cells)
+        cells[index] = number
+        return Board(cells, self.givens)
+
+    def array(self):
+        """
+        Read only numpy view of the cells, shaped size x size, without a copy
+        """
+        import numpy as np
+
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.size, self.size)
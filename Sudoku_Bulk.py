@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 16:12:38 2026
+
+Bulk solving of puzzle files, e.g. third party puzzle sets
+
+Puzzles are read lazily and solved in chunks on a pool of worker processes,
+with the same constraint propagation and search used for larger boards
+(Sudoku_Sized). Every puzzle is searched for a second solution as well, so
+puzzles that are not proper sudokus are reported rather than silently solved.
+
+@author: Jack Rawlinson
+"""
+
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from Sudoku_Format import LINE_BOX_SIZES, grid_to_line, line_to_grid
+from Sudoku_Sized import (Search_Budget_Exceeded, geometry, grid_candidates, propagate,
+                          search)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Fields of the record written for every puzzle
+SOLVE_FIELDS = ("puzzle", "solution", "status", "clues", "nodes", "micros")
+# Status of a solved puzzle, the others are "invalid", "unsolvable",
+# "multiple" (a solution is still given) and "unfinished" (budget ran out)
+SOLVED = "solved"
+
+
+def solve_line(line, budget=10**6):
+    """
+    Solves one puzzle line and checks its solution is unique
+
+    Parameters
+    ----------
+    line : String
+      Puzzle in the 81 character format, or 16, 256 or 625 characters for
+      other box sizes.
+    budget : Int, optional
+      Search nodes allowed before giving up on the puzzle.
+
+    Returns
+    -------
+    record : Dict
+      SOLVE_FIELDS of the puzzle. nodes counts search steps after the first
+      propagation and micros is the solve time in microseconds.
+
+    """
+    record = {"puzzle": line.strip(), "solution": None, "clues": None, "nodes": 0}
+    start = time.perf_counter()
+    try:
+        grid = line_to_grid(line)
+    except ValueError:
+        record["status"] = "invalid"
+        record["micros"] = 0
+        return record
+    shape = geometry(LINE_BOX_SIZES[len(grid)])
+    record["clues"] = sum(1 for number in grid if number)
+    candidates, queue = grid_candidates(shape, grid)
+    solutions = []
+    remaining = [budget]
+    try:
+        if propagate(shape, candidates, queue):
+            found = search(shape, candidates, 2, remaining, solutions)
+        else:
+            found = 0
+        record["status"] = ("unsolvable", SOLVED, "multiple")[found]
+    except Search_Budget_Exceeded:
+        record["status"] = "unfinished"
+    record["nodes"] = budget - remaining[0]
+    if solutions:
+        record["solution"] = grid_to_line([mask.bit_length() for mask in solutions[0]])
+    record["micros"] = round((time.perf_counter() - start) * 1e6)
+    return record
+
+
+def solve_chunk(lines, budget=10**6):
+    """
+    Solves a chunk of puzzle lines in a worker process, see solve_line
+    """
+    return [solve_line(line, budget) for line in lines]
+
+
+def bulk_solve(lines, workers=None, chunk_size=1000, budget=10**6):
+    """
+    Solves puzzle lines on a pool of worker processes
+
+    Lines are read lazily and at most two chunks per worker are in flight, so
+    memory use does not depend on the number of puzzles.
+
+    Parameters
+    ----------
+    lines : Iterable of strings
+      Puzzle lines, see solve_line.
+    workers : Int, optional
+      Number of worker processes, defaults to the number of cores.
+      With 1 worker everything runs in the calling process.
+    chunk_size : Int, optional
+      Number of puzzles handed to a worker at a time.
+    budget : Int, optional
+      Search nodes allowed per puzzle.
+
+    Yields
+    ------
+    record : Dict
+      Result of each puzzle, in input order.
+
+    """
+    workers = workers or os.cpu_count() or 1
+    lines = iter(lines)
+    chunks = iter(lambda: list(itertools.islice(lines, chunk_size)), [])
+    if workers == 1:
+        for chunk in chunks:
+            yield from solve_chunk(chunk, budget)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(solve_chunk, chunk, budget))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        # A consumer that stops early doesn't wait, only the tasks already
+        # started still run to completion
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class Solve_Summary:
+    """
+    Running totals of a bulk solve, for the throughput report
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.puzzles = 0
+        self.nodes = 0
+        self.statuses = {}
+
+    def add(self, record):
+        """
+        Counts the result of one puzzle
+        """
+        self.puzzles += 1
+        self.nodes += record["nodes"]
+        self.statuses[record["status"]] = self.statuses.get(record["status"], 0) + 1
+
+    def report(self):
+        """
+        One line summary: puzzles, elapsed time, puzzles per second and statuses
+        """
+        elapsed = time.perf_counter() - self.start
+        rate = self.puzzles / elapsed if elapsed > 0 else 0.0
+        statuses = ", ".join(f'{count} {status}' for status, count in sorted(self.statuses.items()))
+        return (f'{self.puzzles} puzzles in {elapsed:.2f} s, {rate:.0f} puzzles/s, '
+                f'{self.nodes / max(self.puzzles, 1):.1f} nodes per puzzle'
+                + (f' ({statuses})' if statuses else ''))
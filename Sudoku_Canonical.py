@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 14:26:51 2026
+
+Canonical form of 9x9 puzzles and a persistent index of the ones already seen
+
+Two puzzles are the same one under symmetry when relabelling the digits,
+shuffling rows within a band, shuffling the bands, the same for columns and
+stacks, and transposing turns one into the other (see Sudoku_Transform). The
+canonical form is the smallest of all those variants, read as 81 digits in row
+order with digits relabelled 1, 2, 3... in order of first appearance and empty
+cells as 0.
+
+Rather than trying all 3.4 million cell orders, the form is built a row at a
+time. A relabelled row with distinct digits always reads 1, 2, 3... so the
+smallest first row is the one with its empty cells earliest, which a table of
+filled cell patterns finds for every transpose, first row and column order at
+once. Only the orders giving the smallest row are kept and extended by the rows
+allowed next, and few survive the first rows, so a puzzle takes a few
+milliseconds.
+
+@author: Jack Rawlinson
+"""
+
+import hashlib
+import itertools
+import logging
+import sqlite3
+from functools import lru_cache
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Every column order keeping stacks together: stack order, then the order within each stack
+COL_ORDERS = np.array([[stack * 3 + within[stack_position][position]
+                        for stack_position, stack in enumerate(stacks) for position in range(3)]
+                       for stacks in itertools.permutations(range(3))
+                       for within in itertools.product(itertools.permutations(range(3)), repeat=3)],
+                      dtype=np.intp)
+# Rows that may follow a band's first row: the other two rows of its band
+OTHER_IN_BAND = np.array([[band * 3 + other for other in range(3) if other != row % 3]
+                          for band in range(3) for row in range(band * 3, band * 3 + 3)],
+                         dtype=np.intp)
+# Rows that may start the second band: every row of the two other bands
+OTHER_BANDS = np.array([[other for other in range(9) if other // 3 != row // 3]
+                        for row in range(9)], dtype=np.intp)
+# Place values that turn a row of 9 digits into one comparable int
+ROW_WEIGHTS = 10 ** np.arange(8, -1, -1, dtype=np.int64)
+# Bytes of the digest keying the dedup index
+DIGEST_SIZE = 16
+
+
+@lru_cache(maxsize=None)
+def pattern_keys():
+    """
+    Table [column order, filled cell mask] of a row's filled cells after the
+    column order, as an int that is smaller the earlier its empty cells come
+
+    Built on first use, 1296 x 512 entries.
+    """
+    masks = np.arange(512)[None, :, None]
+    filled = (masks >> COL_ORDERS[:, None, :]) & 1
+    return (filled << np.arange(8, -1, -1)).sum(axis=2).astype(np.uint16)
+
+
+def relabel_rows(values, labels, next_label):
+    """
+    Relabels one row per candidate, giving new digits the next free label
+
+    Parameters
+    ----------
+    values : 2-D numpy array
+      Original digits of the row of each candidate, shape (n, 9).
+    labels : 2-D numpy array
+      Label of each original digit so far per candidate, shape (n, 10), 0 if
+      not seen yet. Updated in place.
+    next_label : 1-D numpy array
+      Next free label per candidate, updated in place.
+
+    Returns
+    -------
+    row : 2-D numpy array
+      Relabelled rows, empty cells stay 0.
+
+    """
+    candidates = np.arange(len(values))
+    row = np.empty_like(values)
+    for position in range(9):
+        digits = values[:, position]
+        label = labels[candidates, digits]
+        new = (label == 0) & (digits != 0)
+        labels[candidates[new], digits[new]] = next_label[new]
+        next_label[new] += 1
+        row[:, position] = labels[candidates, digits]
+    return row
+
+
+def canonical_form(grid):
+    """
+    Canonical form of a 9x9 puzzle or completed grid
+
+    Parameters
+    ----------
+    grid : Sequence of 81 ints
+      Cell values in row order, 0 for an empty cell, e.g. bytes or a Board.
+
+    Returns
+    -------
+    form : bytes
+      81 cell values, the same for every puzzle equivalent under symmetry.
+
+    Raises
+    ------
+    ValueError
+      If the grid doesn't have 81 cells.
+
+    """
+    cells = np.frombuffer(bytes(grid), dtype=np.uint8)
+    if len(cells) != 81:
+        raise ValueError(f'Only 9x9 grids have a canonical form, got {len(cells)} cells')
+    cells = cells.reshape(9, 9).astype(np.intp)
+    # The grid and its transpose, indexed [transpose, row, column]
+    grids = np.stack([cells, cells.T])
+
+    # First row: the transposes, rows and column orders putting empty cells earliest
+    masks = ((grids != 0) << np.arange(9)).sum(axis=2).ravel()
+    keys = pattern_keys()[:, masks]
+    col_orders, first_rows = np.nonzero(keys == keys.min())
+    transposes = first_rows // 9
+    orders = (first_rows % 9)[:, None]
+    labels = np.zeros((len(transposes), 10), dtype=np.intp)
+    next_label = np.ones(len(transposes), dtype=np.intp)
+    form = []
+    while True:
+        values = grids[transposes[:, None], orders[:, -1:], COL_ORDERS[col_orders]]
+        row = relabel_rows(values, labels, next_label)
+        keys = row @ ROW_WEIGHTS
+        best = keys == keys.min()
+        form.append(row[np.argmax(best)])
+        if orders.shape[1] == 9:
+            break
+        transposes, col_orders, orders = transposes[best], col_orders[best], orders[best]
+        labels, next_label = labels[best], next_label[best]
+
+        # Rows allowed next: the rest of the current band, or any row of an unused band
+        position = orders.shape[1]
+        if position in (1, 4, 7):
+            choices = OTHER_IN_BAND[orders[:, -1]]
+        elif position in (2, 5, 8):
+            # The row of the band not used by the last two
+            choices = (orders[:, -1] // 3 * 3 + 3 - orders[:, -1] % 3 - orders[:, -2] % 3)[:, None]
+        elif position == 3:
+            choices = OTHER_BANDS[orders[:, 0]]
+        else:
+            band = 3 - orders[:, 0] // 3 - orders[:, 3] // 3
+            choices = band[:, None] * 3 + np.arange(3)
+        parents = np.repeat(np.arange(len(orders)), choices.shape[1])
+        rows = choices.ravel()
+        transposes, col_orders = transposes[parents], col_orders[parents]
+        labels, next_label = labels[parents], next_label[parents].copy()
+        orders = np.column_stack([orders[parents], rows])
+    return np.concatenate(form).astype(np.uint8).tobytes()
+
+
+def canonical_digest(grid):
+    """
+    blake2b digest of the canonical form, the key of Dedup_Index
+    """
+    return hashlib.blake2b(canonical_form(grid), digest_size=DIGEST_SIZE).digest()
+
+
+class Dedup_Index:
+    """
+    sqlite file of the canonical digests of puzzles already seen
+    """
+
+    def __init__(self, path, commit_every=10000):
+        """
+        Parameters
+        ----------
+        path : String
+          Index file, created if it does not exist.
+        commit_every : Int, optional
+          New digests written per transaction, committing every insert
+          would make the disk the bottleneck.
+
+        """
+        self.path = path
+        self.commit_every = commit_every
+        self.pending = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS puzzles "
+                                "(digest BLOB PRIMARY KEY, puzzle_id TEXT) WITHOUT ROWID")
+
+    def add(self, grid, puzzle_id=None):
+        """
+        Records a puzzle unless an equivalent one is already in the index
+
+        Parameters
+        ----------
+        grid : Sequence of 81 ints
+          Puzzle to record.
+        puzzle_id : String, optional
+          Stored with the digest, e.g. to find the earlier puzzle of a duplicate.
+
+        Returns
+        -------
+        Bool
+          True if the puzzle is new, False for a duplicate.
+
+        """
+        cursor = self.connection.execute(
+            "INSERT OR IGNORE INTO puzzles (digest, puzzle_id) VALUES (?, ?)",
+            (canonical_digest(grid), puzzle_id))
+        if cursor.rowcount != 1:
+            return False
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+        return True
+
+    def __contains__(self, grid):
+        return self.connection.execute("SELECT 1 FROM puzzles WHERE digest = ?",
+                                       (canonical_digest(grid),)).fetchone() is not None
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM puzzles").fetchone()[0]
+
+    def commit(self):
+        """
+        Writes the digests added since the last commit
+        """
+        self.connection.commit()
+        self.pending = 0
+
+    def close(self):
+        """
+        Commits and closes the index file
+        """
+        self.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
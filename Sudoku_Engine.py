@@ -0,0 +1,1293 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:41:12 2026
+
+Headless sudoku generation engine, usable without tkinter or a display
+
+@author: Jack Rawlinson
+"""
+
+import logging
+import sys
+
+import numpy as np
+
+from Sudoku_Board import Board
+from Sudoku_Format import LINE_BOX_SIZES, SYMBOLS, grid_to_line, line_to_grid
+from Sudoku_Grader import DIFFICULTY_RATINGS, grade
+from Sudoku_Masks import Candidate_Masks, DIGITS, PEERS, POPCOUNT
+from Sudoku_Metrics import METRICS, json_lines_hook
+from Sudoku_Sized import (Search_Budget_Exceeded, geometry, popcount, propagate, search,
+                          solvable_by_singles)
+from Sudoku_Solver import has_unique_solution
+from Sudoku_Transform import transform_grids
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Difficulties, graded by the hardest technique needed (see Sudoku_Grader)
+DIFFICULTIES = tuple(DIFFICULTY_RATINGS)
+
+# Bump whenever a change to generation gives different puzzles for the same seed,
+# so old puzzle IDs are rejected instead of silently giving another puzzle
+GENERATOR_VERSION = 2
+# Letter of each difficulty in puzzle IDs, "A" when any difficulty was accepted
+ID_DIFFICULTIES = {"Easy": "E", "Medium": "M", "Hard": "H", None: "A"}
+# Crockford base 32, without I, L, O and U so IDs are easy to read out
+ID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# Lookup tables for batch generation, indexed by candidate mask
+BATCH_PEERS = np.array(PEERS, dtype=np.intp)
+BATCH_POPCOUNT = np.array(POPCOUNT, dtype=np.int16)
+# BATCH_NTH_DIGIT[mask, k] is the k-th number held in mask
+BATCH_NTH_DIGIT = np.zeros((512, 9), dtype=np.uint8)
+for mask, digits in enumerate(DIGITS):
+    BATCH_NTH_DIGIT[mask, :len(digits)] = digits
+# Bit of each number, 0 maps to no bit so failed boards place nothing
+BATCH_BIT = np.array([0] + [1 << number for number in range(9)], dtype=np.int16)
+# Sort key of a filled cell, larger than any empty cell's key
+BATCH_FILLED = np.int16(32767)
+
+
+def puzzle_id(seed, difficulty=None, version=GENERATOR_VERSION):
+    """
+    Short ID that regenerates a puzzle, e.g. '2H-2Q8V0KX1TJ3M6'
+
+    Parameters
+    ----------
+    seed : Int
+      Non negative seed the puzzle was generated from.
+    difficulty : String, optional
+      Difficulty the puzzle was generated for, None if any was accepted.
+    version : Int, optional
+      Generator version the puzzle was made with.
+
+    Returns
+    -------
+    puzzle_id : String
+      Generator version and difficulty letter, then the seed in base 32.
+
+    """
+    digits = ""
+    while True:
+        seed, digit = divmod(seed, 32)
+        digits = ID_ALPHABET[digit] + digits
+        if seed == 0:
+            break
+    return f'{version}{ID_DIFFICULTIES[difficulty]}-{digits}'
+
+
+def parse_puzzle_id(puzzle_id):
+    """
+    Splits a puzzle ID into its generator version, seed and difficulty
+
+    Parameters
+    ----------
+    puzzle_id : String
+      ID made by puzzle_id, case is ignored.
+
+    Returns
+    -------
+    version : Int
+    seed : Int
+    difficulty : String or None
+
+    Raises
+    ------
+    ValueError
+      If the ID is malformed, e.g. its seed is empty or not base 32.
+
+    """
+    try:
+        prefix, digits = puzzle_id.strip().upper().split("-")
+        # An empty seed would read as seed 0 and int() takes a sign or spaces in the version
+        if not digits or not prefix[:-1].isdigit():
+            raise ValueError
+        difficulty = {letter: name for name, letter in ID_DIFFICULTIES.items()}[prefix[-1]]
+        version = int(prefix[:-1])
+        seed = 0
+        for digit in digits:
+            seed = seed * 32 + ID_ALPHABET.index(digit)
+    except (KeyError, ValueError, IndexError):
+        raise ValueError(f'Invalid puzzle ID {puzzle_id!r}') from None
+    return version, seed, difficulty
+
+
+def puzzle_from_seed(seed, difficulty=None, cancel=None):
+    """
+    Generates the puzzle belonging to a seed, tagged with its ID
+
+    Parameters
+    ----------
+    seed : Int
+      Non negative seed, the same seed always gives the same puzzle.
+    difficulty : String, optional
+      Passed on to Sudoku_Engine.generate.
+    cancel : threading.Event, optional
+      Passed on to Sudoku_Engine.
+
+    Returns
+    -------
+    puzzle : Sudoku_Puzzle
+      The puzzle, with puzzle.id set.
+
+    Raises
+    ------
+    Generation_Failed
+      If the seed gives no puzzle at difficulty, see Sudoku_Engine.generate.
+
+    """
+    puzzle = Sudoku_Engine(np.random.default_rng(seed), cancel).generate(difficulty)
+    puzzle.id = puzzle_id(seed, difficulty)
+    return puzzle
+
+
+def puzzle_from_id(puzzle_id):
+    """
+    Regenerates the puzzle an ID was made for
+
+    Parameters
+    ----------
+    puzzle_id : String
+      ID made by puzzle_id.
+
+    Returns
+    -------
+    puzzle : Sudoku_Puzzle
+      Identical to the puzzle originally given this ID.
+
+    """
+    version, seed, difficulty = parse_puzzle_id(puzzle_id)
+    if version != GENERATOR_VERSION:
+        raise ValueError(f'Puzzle ID {puzzle_id!r} is from generator version {version}, '
+                         f'this is version {GENERATOR_VERSION}')
+    return puzzle_from_seed(seed, difficulty)
+
+
+class Sudoku_Puzzle:
+    """
+    A completed sudoku grid together with the puzzle for each difficulty
+    """
+
+    def __init__(self, solution, grids, grades=None):
+        """
+        Parameters
+        ----------
+        solution : bytes
+          81 cell values of the completed grid in row order.
+        grids : Dict
+          Maps each difficulty name to the 81 cell values shown to the user,
+          0 for an empty cell.
+        grades : Dict, optional
+          Maps each difficulty name to the Grade of its grid.
+
+        """
+        self.solution = solution
+        self.grids = grids
+        self.grades = grades or {}
+        # Set when the puzzle was generated from its own seed, see puzzle_from_seed
+        self.id = None
+
+    def line(self, difficulty):
+        """
+        Puzzle for the given difficulty in the 81 character format
+
+        Parameters
+        ----------
+        difficulty : String
+          One of the keys of DIFFICULTIES.
+
+        Returns
+        -------
+        line : String
+          81 character puzzle line.
+
+        """
+        return grid_to_line(self.grids[difficulty])
+
+    def board(self, difficulty):
+        """
+        Immutable Board of the puzzle for the given difficulty, its filled cells are the givens
+        """
+        return Board(self.grids[difficulty])
+
+    def to_dict(self):
+        """
+        Plain dictionary of 81 character lines, for saving as JSON
+        """
+        return {"id": self.id, "solution": grid_to_line(self.solution),
+                "grids": {difficulty: grid_to_line(grid) for difficulty, grid in self.grids.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuilds a puzzle saved with to_dict, grades are not kept
+        """
+        puzzle = cls(line_to_grid(data["solution"]),
+                     {difficulty: line_to_grid(line) for difficulty, line in data["grids"].items()})
+        puzzle.id = data.get("id")
+        return puzzle
+
+
+class Generation_Cancelled(Exception):
+    """
+    Raised by Sudoku_Engine when its cancel event is set
+    """
+
+
+class Generation_Failed(RuntimeError):
+    """
+    Raised by Sudoku_Engine.generate when no grid grades at the requested difficulty
+    """
+
+
+class Sudoku_Engine:
+    """
+    Generates complete sudoku grids and solvable puzzles without any GUI
+    """
+
+    # Placements allowed in one attempt at filling the grid before restarting
+    FILL_BUDGET = 2000
+    # Grids tried when asked for a puzzle graded at a given difficulty
+    GRADE_ATTEMPTS = 50
+    # Search nodes allowed to prove a clue can go on boards other than 9x9
+    SEARCH_BUDGET = 5
+
+    def __init__(self, rng=None, cancel=None, box=3):
+        """
+        Parameters
+        ----------
+        rng : numpy Generator, optional
+          Source of all random choices. A freshly seeded one is used if not given.
+        cancel : threading.Event, optional
+          Checked before every fill attempt and grade retry, Generation_Cancelled
+          is raised once it is set so other threads can stop a long generation.
+        box : Int, optional
+          Box size, 3 for the standard 9x9 board. Other sizes (2, 4 and 5) are
+          filled and dug by the generic code in Sudoku_Sized and not graded.
+
+        """
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.cancel = cancel
+        self.geometry = geometry(box)
+        # Completed grid of boards other than 9x9, which don't use self.board
+        self.sized_solution = None
+        self.board = Candidate_Masks()
+        self.placements = 0
+        self.stats = {"backtracks": 0, "restarts": 0}
+        self.filled_cells = 0
+        self.grades = {}
+        self.easy_grid = None
+        self.medium_grid = None
+        self.hard_grid = None
+
+    @property
+    def solution(self):
+        """
+        Cell values of the last completed grid in row order
+        """
+        if self.geometry.box != 3:
+            return self.sized_solution
+        return bytes(self.board.cells)
+
+    def generate(self, difficulty=None):
+        """
+        Creates a new completed grid and the puzzles for every difficulty
+
+        Parameters
+        ----------
+        difficulty : String, optional
+          When given, grids are regenerated (up to GRADE_ATTEMPTS times) until
+          the puzzle for this difficulty is actually graded at that difficulty.
+
+        Returns
+        -------
+        puzzle : Sudoku_Puzzle
+          Completed grid and the puzzle for each difficulty.
+
+        Raises
+        ------
+        Generation_Failed
+          If none of the GRADE_ATTEMPTS grids grades at difficulty.
+
+        """
+        for attempt in range(self.GRADE_ATTEMPTS):
+            self.check_cancelled()
+            self.complete_grid_generator()
+            self.solvable_grid()
+            puzzle = self.puzzle()
+            # Boards other than 9x9 have no grades to check
+            if difficulty not in puzzle.grades or puzzle.grades[difficulty].difficulty == difficulty:
+                break
+        else:
+            raise Generation_Failed(f'No {difficulty} puzzle in {self.GRADE_ATTEMPTS} attempts')
+        METRICS.count("puzzles")
+        METRICS.count("grade_retries", attempt)
+        logger.debug("Generated %s puzzle after %d retries", difficulty or "a", attempt)
+        METRICS.maybe_emit()
+        return puzzle
+
+    def stream(self, difficulty=None, count=None):
+        """
+        Lazily generates puzzles one at a time
+
+        Parameters
+        ----------
+        difficulty : String, optional
+          Passed on to generate.
+        count : Int, optional
+          Number of puzzles, the stream never ends when not given.
+
+        Yields
+        ------
+        puzzle : Sudoku_Puzzle
+          A new puzzle, unaffected by the ones generated after it.
+
+        """
+        produced = 0
+        while count is None or produced < count:
+            yield self.generate(difficulty)
+            produced += 1
+
+    def check_cancelled(self):
+        """
+        Raises Generation_Cancelled if the cancel event has been set
+        """
+        if self.cancel is not None and self.cancel.is_set():
+            raise Generation_Cancelled()
+
+    def puzzle(self, solution=None):
+        """
+        Sudoku_Puzzle holding the last completed grid and its graded grids
+
+        Parameters
+        ----------
+        solution : bytes, optional
+          Completed grid the grids were dug from when it was passed to
+          solvable_grid, defaults to self.solution.
+
+        Returns
+        -------
+        puzzle : Sudoku_Puzzle
+
+        """
+        return Sudoku_Puzzle(self.solution if solution is None else solution, {
+            "Easy": self.easy_grid,
+            "Medium": self.medium_grid,
+            "Hard": self.hard_grid}, self.grades)
+
+    def complete_grid_generator(self):
+        """
+        Fills every cell of the sudoku grid with a valid number
+
+        Cells are filled most constrained first (fewest remaining candidates),
+        each trying its candidates in a random order and backtracking on a dead
+        end. An attempt that uses up FILL_BUDGET placements is abandoned and
+        restarted with fresh random choices, which bounds the time per grid.
+        The completed grid is stored in self.board.
+
+        Returns
+        -------
+        None.
+
+        """
+        if self.geometry.box != 3:
+            return self.complete_sized_grid()
+        self.stats = {"backtracks": 0, "restarts": 0}
+        with METRICS.timer("fill"):
+            while True:
+                self.check_cancelled()
+                self.board = Candidate_Masks()
+                self.placements = 0
+                # Random cell order so ties between equally constrained cells vary
+                if self.fill_cells(self.rng.permutation(81).tolist()):
+                    break
+                self.stats["restarts"] += 1
+        # Counted once per grid, not per backtrack, to keep the fill loop lean
+        METRICS.count("backtracks", self.stats["backtracks"])
+        METRICS.count("restarts", self.stats["restarts"])
+
+    def fill_cells(self, empty_cells):
+        """
+        Recursively fills the given empty cells, most constrained cell first
+
+        Parameters
+        ----------
+        empty_cells : List of ints
+          Indices of the cells still to fill, in tie breaking order.
+
+        Returns
+        -------
+        Bool
+          True once every cell is filled, False on a dead end or when the
+          placement budget runs out.
+
+        """
+        if not empty_cells:
+            return True
+
+        # Find the cell with the fewest candidates
+        board = self.board
+        best_position = 0
+        best_count = 10
+        for position, index in enumerate(empty_cells):
+            count = POPCOUNT[board.candidates(index)]
+            if count < best_count:
+                best_position = position
+                best_count = count
+                mask = board.candidates(index)
+                if count <= 1:
+                    break
+        if best_count == 0:
+            return False
+
+        # Take the cell out of the empty list, keeping the list order otherwise
+        index = empty_cells.pop(best_position)
+        for number in self.rng.permutation(DIGITS[mask]).tolist():
+            if self.placements == self.FILL_BUDGET:
+                break
+            self.placements += 1
+            board.place(index, number)
+            if self.fill_cells(empty_cells):
+                return True
+            board.remove(index)
+            self.stats["backtracks"] += 1
+        empty_cells.insert(best_position, index)
+        return False
+
+    def complete_sized_grid(self):
+        """
+        Fills a board of any box size, see complete_grid_generator
+
+        Candidates are propagated after every placement (naked and hidden
+        singles), which keeps dead ends rare enough to fill a 25x25 board in
+        a fraction of a second. The completed grid is stored in self.sized_solution.
+
+        Returns
+        -------
+        None.
+
+        """
+        board = self.geometry
+        self.stats = {"backtracks": 0, "restarts": 0}
+        with METRICS.timer("fill"):
+            while True:
+                self.check_cancelled()
+                self.placements = 0
+                candidates = self.fill_sized([board.full_mask] * board.cells,
+                                             self.rng.permutation(board.cells).tolist())
+                if candidates is not None:
+                    break
+                self.stats["restarts"] += 1
+        METRICS.count("backtracks", self.stats["backtracks"])
+        METRICS.count("restarts", self.stats["restarts"])
+        self.sized_solution = bytes(mask.bit_length() for mask in candidates)
+
+    def fill_sized(self, candidates, order):
+        """
+        Recursively fills propagated candidates, most constrained cell first
+
+        Parameters
+        ----------
+        candidates : List of ints
+          Candidate mask of every cell, not changed.
+        order : List of ints
+          Every cell index, in tie breaking order.
+
+        Returns
+        -------
+        candidates : List of ints
+          Single bit masks of the completed grid, None on a dead end or when
+          the placement budget runs out.
+
+        """
+        board = self.geometry
+        best = -1
+        best_count = board.size + 1
+        for index in order:
+            mask = candidates[index]
+            if mask & (mask - 1):
+                count = popcount(mask)
+                if count < best_count:
+                    best = index
+                    best_count = count
+                    if count == 2:
+                        break
+        if best < 0:
+            return candidates
+
+        mask = candidates[best]
+        bits = [1 << number for number in range(board.size) if mask >> number & 1]
+        for position in self.rng.permutation(len(bits)).tolist():
+            if self.placements == self.FILL_BUDGET:
+                break
+            self.placements += 1
+            trial = candidates[:]
+            trial[best] = bits[position]
+            if propagate(board, trial, [best], set(board.cell_units[best])):
+                filled = self.fill_sized(trial, order)
+                if filled is not None:
+                    return filled
+            self.stats["backtracks"] += 1
+        return None
+
+    def generate_batch(self, count, difficulty=None, grids_per_base=None):
+        """
+        Creates count puzzles, filling their grids at once with stacked numpy boards
+
+        Parameters
+        ----------
+        count : Int
+          Number of puzzles to create.
+        difficulty : String, optional
+          When given, only puzzles whose grid for this difficulty is graded at
+          that difficulty are kept, and more grids are filled to replace the rest.
+        grids_per_base : Int, optional
+          Derive the grids by transforming base grids instead of filling each
+          one, see complete_grid_transformed.
+
+        Returns
+        -------
+        puzzles : List of Sudoku_Puzzle
+          Completed grid and the puzzle for each difficulty, for every board.
+
+        """
+        puzzles = []
+        while len(puzzles) < count:
+            # Clue removal needs the solver, so it is done board by board
+            if grids_per_base is None:
+                solutions = self.complete_grid_batch(count - len(puzzles))
+            else:
+                solutions = self.complete_grid_transformed(count - len(puzzles), grids_per_base)
+            for solution in solutions:
+                solution = solution.tobytes()
+                self.solvable_grid(solution)
+                puzzle = self.puzzle(solution)
+                if difficulty is None or puzzle.grades[difficulty].difficulty == difficulty:
+                    puzzles.append(puzzle)
+        return puzzles
+
+    def complete_grid_batch(self, count):
+        """
+        Fills count grids at once, retrying only the boards that hit a dead end
+
+        Parameters
+        ----------
+        count : Int
+          Number of grids to fill.
+
+        Returns
+        -------
+        solutions : 2-D numpy array
+          uint8 array of shape (count, 81), one completed grid per row.
+
+        """
+        solutions = np.zeros((count, 81), dtype=np.uint8)
+        done = 0
+        self.stats = {"backtracks": 0, "restarts": 0}
+        with METRICS.timer("fill_batch"):
+            while done < count:
+                boards, valid = self.fill_batch(count - done)
+                boards = boards[valid]
+                solutions[done:done + len(boards)] = boards
+                done += len(boards)
+                self.stats["restarts"] += int(np.count_nonzero(~valid))
+        METRICS.count("restarts", self.stats["restarts"])
+        return solutions
+
+    def complete_grid_transformed(self, count, grids_per_base=1000):
+        """
+        Derives count grids from a few filled base grids with random transforms
+
+        Each base grid is filled with complete_grid_generator and turned into
+        grids_per_base grids by relabelling digits, shuffling rows, columns,
+        bands and stacks and transposing (see Sudoku_Transform).
+
+        Parameters
+        ----------
+        count : Int
+          Number of grids.
+        grids_per_base : Int, optional
+          Grids derived from each base grid, 1 fills a fresh base every time.
+
+        Returns
+        -------
+        solutions : 2-D numpy array
+          uint8 array of shape (count, 81), one completed grid per row.
+
+        """
+        if grids_per_base < 1:
+            raise ValueError(f'grids_per_base must be at least 1, not {grids_per_base}')
+        solutions = np.empty((count, 81), dtype=np.uint8)
+        for start in range(0, count, grids_per_base):
+            self.complete_grid_generator()
+            base = np.frombuffer(self.solution, dtype=np.uint8)
+            size = min(grids_per_base, count - start)
+            with METRICS.timer("transform"):
+                solutions[start:start + size] = transform_grids(base, self.rng, size)
+        METRICS.count("transformed_grids", count)
+        return solutions
+
+    def fill_batch(self, count):
+        """
+        Fills count boards in lock step, most constrained cell first on each board
+
+        Every step picks one cell per board with the fewest candidates (ties
+        broken by a random cell order per board), places a random candidate and
+        removes it from the cell's peers. There is no backtracking: a board whose
+        chosen cell has no candidates is flagged as failed and left to be retried.
+
+        Parameters
+        ----------
+        count : Int
+          Number of boards.
+
+        Returns
+        -------
+        cells : 2-D numpy array
+          uint8 array of shape (count, 81) with the filled boards.
+        valid : 1-D numpy array
+          True for every board that was filled without a dead end.
+
+        """
+        boards = np.arange(count)
+        board_column = boards[:, None]
+        candidates = np.full((count, 81), 0x1FF, dtype=np.int16)
+        cells = np.zeros((count, 81), dtype=np.uint8)
+        valid = np.ones(count, dtype=bool)
+        # key = candidate count * 128 + random tie break rank, so argmin is the MRV cell
+        key = self.rng.random((count, 81)).argsort(axis=1).astype(np.int16) + 9 * 128
+
+        for _ in range(81):
+            index = key.argmin(axis=1)
+            mask = candidates[boards, index]
+            options = BATCH_POPCOUNT[mask]
+            valid &= options > 0
+
+            # Pick one of the cell's candidates at random on every board
+            choice = (self.rng.random(count) * options).astype(np.intp)
+            number = BATCH_NTH_DIGIT[mask, choice]
+            cells[boards, index] = number
+            key[boards, index] = BATCH_FILLED
+
+            # Remove the number from the peers and refresh their sort keys
+            peers = BATCH_PEERS[index]
+            peer_candidates = candidates[board_column, peers] & ~BATCH_BIT[number][:, None]
+            candidates[board_column, peers] = peer_candidates
+            peer_key = key[board_column, peers]
+            key[board_column, peers] = np.where(
+                peer_key == BATCH_FILLED, BATCH_FILLED,
+                (peer_key & 127) + BATCH_POPCOUNT[peer_candidates] * 128)
+
+        return cells, valid
+
+    def solvable_grid(self, solution=None):
+        """
+        Creates solvable sudoku grids for each difficulty using the complete grid
+
+        Clues are removed one cell at a time in a random order, and a removal is
+        only kept when the puzzle still has a unique solution, until no more
+        clues can go. That minimal grid is the Hard grid. Easy and Medium are
+        the emptiest grids along the way whose grade is within their rating.
+
+        Parameters
+        ----------
+        solution : bytes, optional
+          Completed grid to use, defaults to the one in self.board.
+
+        Returns
+        -------
+        None.
+
+        """
+        if self.geometry.box != 3:
+            return self.solvable_sized_grid(solution)
+        solution = bytes(self.board.cells if solution is None else solution)
+        shown = bytearray(solution)
+        # Cells removed so far, in order
+        removed = []
+        with METRICS.timer("reveal"):
+            for index in self.rng.permutation(81).tolist():
+                number = shown[index]
+                shown[index] = 0
+                # Put the clue back if the puzzle would have more than one solution
+                if has_unique_solution(shown):
+                    removed.append(index)
+                else:
+                    shown[index] = number
+        METRICS.count("uniqueness_checks", 81)
+        METRICS.count("clues_restored", 81 - len(removed))
+
+        self.filled_cells = 81 - len(removed)
+        self.hard_grid = bytes(shown)
+        with METRICS.timer("grade"):
+            hard_grade = grade(shown)
+            self.easy_grid, easy_grade = self.hardest_within(solution, removed, hard_grade, "Easy")
+            self.medium_grid, medium_grade = self.hardest_within(solution, removed, hard_grade,
+                                                                 "Medium")
+        self.grades = {"Easy": easy_grade, "Medium": medium_grade, "Hard": hard_grade}
+
+    def solvable_sized_grid(self, solution=None):
+        """
+        Creates the puzzles of a board of any box size, see solvable_grid
+
+        Clues are removed in a random order while the puzzle stays unique. As
+        the puzzle was unique before, removing the clue v from a cell keeps it
+        unique exactly when no solution has another number in that cell, so
+        each removal is one search for such a solution. Most are settled
+        because v is the cell's only candidate or its only place in a unit.
+        A search that takes more than SEARCH_BUDGET nodes keeps the clue, so
+        large puzzles are unique but not always minimal.
+
+        Easy is the emptiest grid along the way solvable by hidden singles
+        alone, Medium by naked and hidden singles, Hard the final grid.
+
+        Parameters
+        ----------
+        solution : bytes, optional
+          Completed grid to use, defaults to self.sized_solution.
+
+        Returns
+        -------
+        None.
+
+        """
+        board = self.geometry
+        solution = bytes(self.sized_solution if solution is None else solution)
+        shown = bytearray(solution)
+        # Numbers used by the clues of every row, collumn and box
+        rows = [board.full_mask] * board.size
+        cols = [board.full_mask] * board.size
+        boxes = [board.full_mask] * board.size
+        removed = []
+
+        def used(index):
+            return rows[board.row_of[index]] | cols[board.col_of[index]] | boxes[board.box_of[index]]
+
+        with METRICS.timer("reveal"):
+            for index in self.rng.permutation(board.cells).tolist():
+                bit = 1 << (shown[index] - 1)
+                row, col, box = board.row_of[index], board.col_of[index], board.box_of[index]
+                shown[index] = 0
+                rows[row] &= ~bit
+                cols[col] &= ~bit
+                boxes[box] &= ~bit
+                if self.only_choice(index, bit, shown, used) or self.no_other_solution(
+                        index, bit, shown, used):
+                    removed.append(index)
+                    continue
+                shown[index] = solution[index]
+                rows[row] |= bit
+                cols[col] |= bit
+                boxes[box] |= bit
+
+        self.filled_cells = board.cells - len(removed)
+        self.hard_grid = bytes(shown)
+
+        def grid_after(count):
+            grid = bytearray(solution)
+            for index in removed[:count]:
+                grid[index] = 0
+            return grid
+
+        grids = []
+        for naked in (False, True):
+            # Solvable by singles is kept by adding clues, so the grids can be binary searched
+            low, high = 0, len(removed) + 1
+            while high - low > 1:
+                middle = (low + high) // 2
+                if solvable_by_singles(board, grid_after(middle), naked):
+                    low = middle
+                else:
+                    high = middle
+            grids.append(bytes(grid_after(low)))
+        self.easy_grid, self.medium_grid = grids
+        self.grades = {}
+
+    def only_choice(self, index, bit, shown, used):
+        """
+        True if a removed clue is the only candidate of its cell or the only
+        place for its number in the cell's row, collumn or box
+        """
+        board = self.geometry
+        if not board.full_mask & ~used(index) & ~bit:
+            return True
+        return any(all(other == index or shown[other] or used(other) & bit
+                       for other in board.units[unit])
+                   for unit in board.cell_units[index])
+
+    def no_other_solution(self, index, bit, shown, used):
+        """
+        True if no solution puts another number than bit's in the cell index
+        """
+        board = self.geometry
+        candidates = []
+        queue = []
+        for other, number in enumerate(shown):
+            if number:
+                candidates.append(1 << (number - 1))
+            else:
+                mask = board.full_mask & ~used(other)
+                if other == index:
+                    mask &= ~bit
+                candidates.append(mask)
+                if not mask & (mask - 1):
+                    queue.append(other)
+        if not candidates[index]:
+            return True
+        try:
+            return not (propagate(board, candidates, queue)
+                        and search(board, candidates, 1, [self.SEARCH_BUDGET]))
+        except Search_Budget_Exceeded:
+            METRICS.count("search_budget_exceeded")
+            return False
+
+    @staticmethod
+    def hardest_within(solution, removed, final_grade, difficulty):
+        """
+        Finds the emptiest grid of a clue removal sequence within a difficulty
+
+        Removing clues never makes a puzzle easier, so the grids can be
+        binary searched, grading only a handful of them.
+
+        Parameters
+        ----------
+        solution : bytes
+          Completed grid.
+        removed : List of ints
+          Cells in the order they were removed.
+        final_grade : Grade
+          Grade of the grid with every cell of removed taken out.
+        difficulty : String
+          One of DIFFICULTIES.
+
+        Returns
+        -------
+        grid : bytes
+          Grid with the longest prefix of removed taken out that is still
+          graded within the difficulty's rating.
+        grade : Grade
+          Grade of that grid.
+
+        """
+        def grid_after(count):
+            grid = bytearray(solution)
+            for index in removed[:count]:
+                grid[index] = 0
+            return grid
+
+        limit = DIFFICULTY_RATINGS[difficulty]
+        if final_grade.rating <= limit:
+            return bytes(grid_after(len(removed))), final_grade
+
+        # The completed grid (no removals) needs no technique at all
+        low, high = 0, len(removed)
+        low_grade = grade(solution)
+        while high - low > 1:
+            middle = (low + high) // 2
+            middle_grade = grade(grid_after(middle))
+            if middle_grade.rating <= limit:
+                low, low_grade = middle, middle_grade
+            else:
+                high = middle
+        return bytes(grid_after(low)), low_grade
+
+
+def parse_difficulty(name):
+    """
+    Matches a difficulty given on the command line, ignoring case
+    """
+    for difficulty in DIFFICULTIES:
+        if difficulty.lower() == name.lower():
+            return difficulty
+    # argparse is only loaded by the command line, not by every import of the engine
+    import argparse
+
+    raise argparse.ArgumentTypeError(
+        f'Unknown difficulty {name!r}, choose from {", ".join(DIFFICULTIES)}')
+
+
+def generate_command(args):
+    """
+    Writes args.count puzzles of args.difficulty to args.out in args.format,
+    and/or streams them into the puzzle bank args.bank
+
+    With args.dedup, puzzles equivalent to one already in that index are
+    skipped and more are generated in their place.
+    """
+    from Sudoku_Bank import Bank_Writer
+    from Sudoku_Factory import Puzzle_Factory
+    from Sudoku_Stream import WRITERS, puzzle_record
+
+    if args.bank and args.box_size != 3:
+        sys.exit("Only 9x9 puzzles can be stored in a puzzle bank")
+    if args.dedup and args.box_size != 3:
+        sys.exit("Only 9x9 puzzles can be deduplicated")
+    factory = Puzzle_Factory(args.seed, args.workers, args.chunk_size, args.batch_size,
+                             args.difficulty, args.grids_per_base, args.box_size)
+    count = None if args.stream else args.count
+    # Report the seed so the same run can be regenerated
+    print(f'seed = {factory.seed}', file=sys.stderr)
+    logger.info("Generating %s %s puzzles with %s workers", count or "endless", args.difficulty,
+                args.workers or "all")
+    # Lines go to stdout unless only a bank was asked for
+    if args.out is None:
+        out = None if args.bank else sys.stdout
+    else:
+        out = sys.stdout if args.out == "-" else open(args.out, "w")
+    fields = ["puzzle"]
+    if args.with_solution:
+        fields.append("solution")
+    if args.with_id:
+        fields.append("id")
+    if args.format != "line":
+        fields.append("difficulty")
+    writer = WRITERS[args.format](out, fields, args.flush_every) if out is not None else None
+    bank = Bank_Writer(args.bank) if args.bank else None
+    index = None
+    if args.dedup:
+        from Sudoku_Canonical import Dedup_Index
+
+        index = Dedup_Index(args.dedup)
+    written = duplicates = 0
+    start = 0
+    try:
+        # Duplicates don't count, so a deduplicated run asks for the puzzles still
+        # missing from the chunks after those used so far, until it has enough
+        while count is None or written < count:
+            missing = None if count is None else count - written
+            for puzzles in factory.results(missing, start):
+                for puzzle in puzzles:
+                    if index is not None and not index.add(puzzle.grids[args.difficulty],
+                                                           puzzle.id):
+                        duplicates += 1
+                        METRICS.count("duplicates")
+                        continue
+                    if bank is not None:
+                        bank.append(puzzle, args.difficulty)
+                    if writer is not None:
+                        writer.write(puzzle_record(puzzle, args.difficulty, fields))
+                    written += 1
+                if args.stream and writer is not None:
+                    # Written as every task completes, so a reader that went away is noticed
+                    writer.flush()
+            start += factory.chunk_count(missing)
+    finally:
+        if writer is not None:
+            writer.close()
+        if out is not None and out is not sys.stdout:
+            out.close()
+        if bank is not None:
+            bank.close()
+        if index is not None:
+            index.close()
+            logger.info("Skipped %d puzzles equivalent to ones already in %s", duplicates,
+                        args.dedup)
+
+
+def open_input(path):
+    """
+    Text file to read records from, stdin for '-'
+    """
+    return sys.stdin if path == "-" else open(path)
+
+
+def grade_command(args):
+    """
+    Reads puzzles from args.input and writes them to args.out with their grades
+    """
+    import itertools
+
+    from Sudoku_Stream import FIELDS, WRITERS, grade_record, read_records
+
+    source = open_input(args.input)
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    writer = None
+    try:
+        records = read_records(source, args.input_format or args.format)
+        first = next(records, None)
+        if first is None:
+            return
+        # The first record decides the fields, later records are written the same way
+        graded = ("difficulty", "rating", "hardest")
+        fields = [field for field in FIELDS if field in first or field in graded]
+        writer = WRITERS[args.format](out, fields, args.flush_every)
+        for number, record in enumerate(itertools.chain([first], records), 1):
+            try:
+                writer.write(grade_record(record))
+            except ValueError as error:
+                sys.exit(f'Record {number}: {error}')
+    except ValueError as error:
+        sys.exit(str(error))
+    finally:
+        if writer is not None:
+            writer.close()
+        if out is not sys.stdout:
+            out.close()
+        if source is not sys.stdin:
+            source.close()
+
+
+def store_command(args):
+    """
+    Appends puzzles read from args.input to the puzzle bank args.bank
+    """
+    from Sudoku_Bank import Bank_Writer
+    from Sudoku_Stream import read_records, record_puzzle
+
+    source = open_input(args.input)
+    stored = 0
+    try:
+        with Bank_Writer(args.bank) as bank:
+            for record in read_records(source, args.format):
+                try:
+                    bank.append(*record_puzzle(record))
+                except ValueError as error:
+                    sys.exit(f'Record {stored + 1}: {error}')
+                stored += 1
+    except ValueError as error:
+        sys.exit(str(error))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    logger.info("Stored %d puzzles in %s", stored, args.bank)
+
+
+def solve_command(args):
+    """
+    Solves the puzzles read from args.input, writing solutions and solve
+    statistics to args.out and the throughput to stderr
+    """
+    from Sudoku_Bulk import SOLVE_FIELDS, Solve_Summary, bulk_solve
+    from Sudoku_Stream import WRITERS, read_records
+
+    source = open_input(args.input)
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    writer = WRITERS[args.format](out, SOLVE_FIELDS, args.flush_every)
+    summary = Solve_Summary()
+    try:
+        lines = (record["puzzle"] for record in read_records(source, args.input_format))
+        for record in bulk_solve(lines, args.workers, args.chunk_size, args.budget):
+            summary.add(record)
+            writer.write(record)
+    except ValueError as error:
+        sys.exit(str(error))
+    finally:
+        writer.close()
+        if out is not sys.stdout:
+            out.close()
+        if source is not sys.stdin:
+            source.close()
+        print(summary.report(), file=sys.stderr)
+
+
+def pick_command(args):
+    """
+    Prints random puzzles of args.difficulty from the bank args.bank
+    """
+    from Sudoku_Bank import Puzzle_Bank
+
+    with Puzzle_Bank(args.bank) as bank:
+        for _ in range(args.count):
+            try:
+                puzzle = bank.random(args.difficulty, min_clues=args.min_clues,
+                                     max_clues=args.max_clues)
+            except LookupError as error:
+                sys.exit(str(error))
+            line = puzzle.line(args.difficulty)
+            if args.with_solution:
+                line += "," + grid_to_line(puzzle.solution)
+            print(line)
+
+
+def show_command(args):
+    """
+    Prints the puzzle belonging to each of args.ids
+    """
+    for puzzle_id in args.ids:
+        try:
+            difficulty = parse_puzzle_id(puzzle_id)[2]
+            puzzle = puzzle_from_id(puzzle_id)
+        except ValueError as error:
+            sys.exit(str(error))
+        line = puzzle.line(difficulty or "Hard")
+        if args.with_solution:
+            line += "," + grid_to_line(puzzle.solution)
+        print(line)
+
+
+def serve_command(args):
+    """
+    Runs the HTTP puzzle service until interrupted
+    """
+    import asyncio
+
+    from Sudoku_Server import Sudoku_Server
+
+    server = Sudoku_Server(args.host, args.port, args.workers or None, args.buffer,
+                           args.batch_window_ms / 1000)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+FORMATS = ("line", "jsonl", "csv")
+
+
+def add_format_arguments(parser):
+    """
+    Adds the output format options shared by the commands writing records
+    """
+    parser.add_argument("--format", choices=FORMATS, default="line",
+                        help="line: comma separated values (the default), jsonl: a JSON object "
+                             "per line, csv: CSV with a header row")
+    parser.add_argument("--flush-every", type=int, default=1000,
+                        help="Records buffered before each write to the output")
+
+
+def main(argv=None):
+    """
+    Command line entry point, e.g.
+      python -m Sudoku_Engine generate --count 100 --difficulty hard --out puzzles.txt
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="Sudoku_Engine",
+                                     description="Headless sudoku puzzle generation")
+    parser.add_argument("--verbose", "-v", action="count", default=0,
+                        help="Log progress to stderr, -vv for debug detail")
+    parser.add_argument("--metrics", default=None,
+                        help="Append phase counters and timers to this file as JSON lines "
+                             "(covers work done in this process only)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Generate a batch of puzzles")
+    generate.add_argument("--count", type=int, default=1,
+                          help="Number of puzzles to generate")
+    generate.add_argument("--stream", action="store_true",
+                          help="Keep generating until the output is closed or interrupted, "
+                               "ignores --count. Records are written as each worker task "
+                               "completes rather than every --flush-every records")
+    generate.add_argument("--difficulty", type=parse_difficulty, default="Hard",
+                          help="Easy, Medium or Hard")
+    generate.add_argument("--out", default=None,
+                          help="Output file, '-' for stdout (the default unless --bank is given)")
+    generate.add_argument("--bank", default=None,
+                          help="Append the puzzles to this packed puzzle bank")
+    generate.add_argument("--with-solution", action="store_true",
+                          help="Append ',<solution>' to every puzzle line")
+    generate.add_argument("--batch-size", type=int, default=1,
+                          help="Generate this many boards at once with numpy")
+    generate.add_argument("--seed", type=int, default=None,
+                          help="Master seed, the same seed always gives the same puzzles")
+    generate.add_argument("--workers", type=int, default=1,
+                          help="Worker processes, 0 for one per core")
+    generate.add_argument("--chunk-size", type=int, default=1000,
+                          help="Puzzles generated from each random stream, the same seed and "
+                               "chunk size give the same puzzles")
+    generate.add_argument("--with-id", action="store_true",
+                          help="Append ',<puzzle id>' to every puzzle line "
+                               "(9x9 only, not with --batch-size or --grids-per-base)")
+    generate.add_argument("--grids-per-base", type=int, default=None,
+                          help="Fill one base grid per this many puzzles and derive the rest "
+                               "by shuffling rows, columns and digits")
+    generate.add_argument("--box-size", type=int, default=3, choices=range(2, 6),
+                          help="2 for 4x4 boards, 3 for 9x9 (default), 4 for 16x16, 5 for 25x25. "
+                               "Other sizes than 9x9 are not graded, have no IDs and can't be banked")
+    generate.add_argument("--dedup", default=None,
+                          help="Skip puzzles equivalent under symmetry to one already in this "
+                               "index file (created if missing), and add the new ones to it")
+    add_format_arguments(generate)
+    generate.set_defaults(func=generate_command)
+
+    grade_puzzles = commands.add_parser("grade", help="Grade puzzles read from a file or stdin")
+    grade_puzzles.add_argument("--input", default="-",
+                               help="File of puzzles, '-' for stdin (the default)")
+    grade_puzzles.add_argument("--out", default="-", help="Output file, '-' for stdout")
+    grade_puzzles.add_argument("--input-format", choices=FORMATS, default=None,
+                               help="Format of the input, the same as --format when not given")
+    add_format_arguments(grade_puzzles)
+    grade_puzzles.set_defaults(func=grade_command)
+
+    store = commands.add_parser("store", help="Append puzzles read from a file or stdin "
+                                              "to a puzzle bank")
+    store.add_argument("bank", help="Puzzle bank file, created if missing")
+    store.add_argument("--input", default="-",
+                       help="File of puzzles, '-' for stdin (the default). Puzzles without "
+                            "a solution are solved, without a difficulty graded")
+    store.add_argument("--format", choices=FORMATS, default="line", help="Format of the input")
+    store.set_defaults(func=store_command)
+
+    solve = commands.add_parser("solve", help="Solve puzzles read from a file or stdin")
+    solve.add_argument("--input", default="-",
+                       help="File of puzzles, '-' for stdin (the default)")
+    solve.add_argument("--input-format", choices=FORMATS, default="line",
+                       help="Format of the input, lines of 81 characters by default")
+    solve.add_argument("--out", default="-", help="Output file, '-' for stdout")
+    solve.add_argument("--workers", type=int, default=0,
+                       help="Worker processes, 0 for one per core")
+    solve.add_argument("--chunk-size", type=int, default=1000,
+                       help="Puzzles handed to a worker at a time")
+    solve.add_argument("--budget", type=int, default=10**6,
+                       help="Search steps allowed per puzzle before it is reported unfinished")
+    add_format_arguments(solve)
+    solve.set_defaults(func=solve_command)
+
+    show = commands.add_parser("show", help="Regenerate puzzles from their IDs")
+    show.add_argument("ids", nargs="+", help="Puzzle IDs, e.g. 2H-2Q8V0KX1TJ3M6")
+    show.add_argument("--with-solution", action="store_true",
+                      help="Append ',<solution>' to every puzzle line")
+    show.set_defaults(func=show_command)
+
+    pick = commands.add_parser("pick", help="Print random puzzles from a puzzle bank")
+    pick.add_argument("bank", help="Puzzle bank file")
+    pick.add_argument("--difficulty", type=parse_difficulty, default="Hard",
+                      help="Easy, Medium or Hard")
+    pick.add_argument("--count", type=int, default=1, help="Number of puzzles to print")
+    pick.add_argument("--min-clues", type=int, default=0, help="Fewest clues allowed")
+    pick.add_argument("--max-clues", type=int, default=81, help="Most clues allowed")
+    pick.add_argument("--with-solution", action="store_true",
+                      help="Append ',<solution>' to every puzzle line")
+    pick.set_defaults(func=pick_command)
+
+    serve = commands.add_parser("serve", help="Serve puzzles over HTTP/JSON")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    serve.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    serve.add_argument("--workers", type=int, default=0,
+                       help="Worker processes for generating (and as many for solving), 0 for one per core")
+    serve.add_argument("--buffer", type=int, default=16,
+                       help="Puzzles kept ready for every difficulty")
+    serve.add_argument("--batch-window-ms", type=float, default=2,
+                       help="Solve and validate requests arriving this close together are batched")
+    serve.set_defaults(func=serve_command)
+
+    args = parser.parse_args(argv)
+    if args.command == "generate" and args.with_id:
+        # An ID regenerates a puzzle from its own seed, batched puzzles share the batch's stream
+        if args.batch_size > 1:
+            generate.error("--with-id can't be combined with --batch-size, "
+                           "batched puzzles have no IDs")
+        if args.grids_per_base is not None:
+            generate.error("--with-id can't be combined with --grids-per-base, "
+                           "grids derived from a base grid have no IDs")
+        if args.box_size != 3:
+            generate.error("--with-id needs --box-size 3, IDs only regenerate 9x9 puzzles")
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG if args.verbose > 1 else logging.INFO,
+                            format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    if args.metrics:
+        METRICS.add_hook(json_lines_hook(args.metrics))
+    try:
+        args.func(args)
+    except Generation_Failed as error:
+        sys.exit(str(error))
+    except BrokenPipeError:
+        # The reader went away, e.g. generate --stream | head
+        sys.stderr.close()
+    finally:
+        METRICS.emit()
+
+
+if __name__ == "__main__":
+    main()
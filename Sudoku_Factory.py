@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:20:05 2026
+
+Multiprocess puzzle factory with reproducible seeding
+
+Work is split into fixed size chunks. Chunk i is always generated from its own
+numpy Generator, seeded with SeedSequence(seed, spawn_key=(i,)), i.e. the i-th
+spawned child of the master seed. The output therefore only depends on the
+master seed and the chunk size, and any chunk can be regenerated on its own.
+
+Puzzles generated one by one get their own seed, drawn from the chunk's stream
+by the calling process, so a chunk is handed to the workers as small tasks of
+TASK_SIZE seeds. Results then arrive steadily rather than a chunk at a time,
+and a consumer that stops early leaves little work running.
+
+@author: Jack Rawlinson
+"""
+
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Sudoku_Engine import Sudoku_Engine, puzzle_from_seed
+
+
+def chunk_rng(entropy, index):
+    """
+    numpy Generator of chunk index of the run seeded with entropy
+    """
+    return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(index,)))
+
+
+def chunk_seeds(entropy, index, count):
+    """
+    Seeds of the first count puzzles of a chunk generated one by one
+    """
+    return chunk_rng(entropy, index).integers(2**63, size=count).tolist()
+
+
+def generate_seeds(seeds, difficulty=None):
+    """
+    Generates the puzzle of every seed, each one with its ID set
+    """
+    return [puzzle_from_seed(seed, difficulty) for seed in seeds]
+
+
+def generate_chunk(entropy, index, count, batch_size=1, difficulty=None, grids_per_base=None,
+                   box=3):
+    """
+    Generates one chunk of puzzles from its own random stream
+
+    Parameters
+    ----------
+    entropy : Int
+      Master seed of the run.
+    index : Int
+      Position of the chunk in the run, selects the child random stream.
+    count : Int
+      Number of puzzles in the chunk.
+    batch_size : Int, optional
+      Generate the chunk with generate_batch when larger than 1.
+    difficulty : String, optional
+      Only keep puzzles graded at this difficulty, see Sudoku_Engine.generate.
+    grids_per_base : Int, optional
+      Derive grids from transformed base grids, see
+      Sudoku_Engine.complete_grid_transformed. Implies batching.
+    box : Int, optional
+      Box size of the boards. Boards other than 9x9 are generated one by one
+      from the chunk's stream, without IDs.
+
+    Returns
+    -------
+    puzzles : List of Sudoku_Puzzle
+      The puzzles of the chunk in order. Unless batched, each one has its ID set.
+
+    """
+    if box == 3 and batch_size == 1 and grids_per_base is None:
+        # Every puzzle gets its own seed, so it can be regenerated from its ID alone
+        return generate_seeds(chunk_seeds(entropy, index, count), difficulty)
+    rng = chunk_rng(entropy, index)
+    if box != 3:
+        engine = Sudoku_Engine(rng, box=box)
+        return [engine.generate(difficulty) for _ in range(count)]
+    if grids_per_base is not None:
+        # Batches smaller than grids_per_base would fill a base grid per batch
+        batch_size = max(batch_size, grids_per_base)
+    engine = Sudoku_Engine(rng)
+    puzzles = []
+    while len(puzzles) < count:
+        puzzles.extend(engine.generate_batch(min(batch_size, count - len(puzzles)), difficulty,
+                                             grids_per_base))
+    return puzzles
+
+
+class Puzzle_Factory:
+    """
+    Spreads puzzle generation over a pool of worker processes
+    """
+
+    # Seeds handed to a worker at a time when puzzles are generated one by one
+    TASK_SIZE = 8
+
+    def __init__(self, seed=None, workers=None, chunk_size=1000, batch_size=1, difficulty=None,
+                 grids_per_base=None, box=3):
+        """
+        Parameters
+        ----------
+        seed : Int, optional
+          Master seed. Fresh entropy is drawn when not given, read it back
+          from self.seed to regenerate the same run later.
+        workers : Int, optional
+          Number of worker processes, defaults to the number of cores.
+          With 1 worker everything runs in the calling process.
+        chunk_size : Int, optional
+          Number of puzzles generated from each random stream. Batched
+          chunks and boards other than 9x9 are handed to a worker whole.
+        batch_size, difficulty, grids_per_base, box : optional
+          Passed on to generate_chunk.
+
+        """
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.difficulty = difficulty
+        self.grids_per_base = grids_per_base
+        self.box = box
+
+    def chunk(self, index):
+        """
+        Regenerates a single chunk of a run, e.g. to replace a lost batch
+
+        Parameters
+        ----------
+        index : Int
+          Position of the chunk in the run.
+
+        Returns
+        -------
+        puzzles : List of Sudoku_Puzzle
+          The same puzzles the full run produced for this chunk.
+
+        """
+        return generate_chunk(self.seed, index, self.chunk_size, self.batch_size, self.difficulty,
+                              self.grids_per_base, self.box)
+
+    def chunk_count(self, count):
+        """
+        Number of chunks count puzzles take up
+        """
+        return (count + self.chunk_size - 1) // self.chunk_size
+
+    def tasks(self, count=None, start=0):
+        """
+        Splits count puzzles into the tasks handed to the workers
+
+        Parameters
+        ----------
+        count : Int, optional
+          Number of puzzles, the tasks never end when not given.
+        start : Int, optional
+          Chunk the puzzles start from.
+
+        Yields
+        ------
+        function : Callable
+          Worker function returning a list of puzzles.
+        args : Tuple
+          Its arguments.
+
+        """
+        if count is None:
+            chunks = ((index, self.chunk_size) for index in itertools.count(start))
+        else:
+            chunks = ((start + number, min(self.chunk_size, count - number * self.chunk_size))
+                      for number in range(self.chunk_count(count)))
+        for index, size in chunks:
+            if self.box == 3 and self.batch_size == 1 and self.grids_per_base is None:
+                seeds = chunk_seeds(self.seed, index, size)
+                for first in range(0, size, self.TASK_SIZE):
+                    yield generate_seeds, (seeds[first:first + self.TASK_SIZE], self.difficulty)
+            else:
+                yield generate_chunk, (self.seed, index, size, self.batch_size, self.difficulty,
+                                       self.grids_per_base, self.box)
+
+    def results(self, count=None, start=0):
+        """
+        Generates count puzzles, yielding the puzzles of each task as it completes
+
+        Tasks are taken in order whichever worker finishes first, and at most
+        two per worker are queued or finished but not yet consumed, so memory
+        use does not grow with count or with a slow consumer.
+
+        Parameters
+        ----------
+        count : Int, optional
+          Number of puzzles to create, generation never stops when not given.
+        start : Int, optional
+          Chunk to start from, e.g. to generate more puzzles after a run of
+          count puzzles from chunk_count(count) on.
+
+        Yields
+        ------
+        puzzles : List of Sudoku_Puzzle
+          Next puzzles of the run.
+
+        """
+        if self.workers == 1:
+            for function, args in self.tasks(count, start):
+                yield function(*args)
+            return
+
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        pending = deque()
+        try:
+            for function, args in self.tasks(count, start):
+                pending.append(pool.submit(function, *args))
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # A consumer that stops early doesn't wait, only the tasks already
+            # started still run to completion
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def generate(self, count=None, start=0):
+        """
+        Generates count puzzles, yielded in order as tasks complete, see results
+
+        Parameters
+        ----------
+        count : Int, optional
+          Number of puzzles to create, generation never stops when not given.
+        start : Int, optional
+          Chunk to start from.
+
+        Yields
+        ------
+        puzzle : Sudoku_Puzzle
+          Next puzzle of the run.
+
+        """
+        for puzzles in self.results(count, start):
+            yield from puzzles
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 15:02:46 2026
+
+Puzzle line format, kept free of numpy so the GUI and light tools load fast
+
+Sudoku_Engine re-exports everything here.
+
+@author: Jack Rawlinson
+"""
+
+# Characters of the numbers 1-25 in puzzle lines
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+# Box size of the board a puzzle line of each length belongs to
+LINE_BOX_SIZES = {box ** 4: box for box in range(2, 6)}
+
+
+def grid_to_line(grid):
+    """
+    Converts a grid into the standard 81 character puzzle format
+
+    Boards larger than 9x9 continue the numbers with letters, 10 is 'A'.
+
+    Parameters
+    ----------
+    grid : Sequence of ints
+      Cell values in row order, 0 for an empty cell.
+
+    Returns
+    -------
+    line : String
+      One character per cell, SYMBOLS for filled cells and '.' for empty cells.
+
+    """
+    return "".join(SYMBOLS[value - 1] if value else "." for value in grid)
+
+
+def line_to_grid(line):
+    """
+    Converts an 81 character puzzle line (or 16, 256 or 625 for other box sizes) back into a grid
+
+    Parameters
+    ----------
+    line : String
+      One character per cell, SYMBOLS for filled cells and '.' or '0' for empty cells.
+
+    Returns
+    -------
+    grid : bytes
+      Cell values in row order, 0 for an empty cell.
+
+    """
+    line = line.strip().upper()
+    if len(line) not in LINE_BOX_SIZES:
+        raise ValueError(f'Puzzle line must be 81 characters, got {len(line)}')
+    size = LINE_BOX_SIZES[len(line)] ** 2
+    try:
+        grid = bytes(0 if char in ".0" else SYMBOLS.index(char, 0, size) + 1 for char in line)
+    except ValueError:
+        raise ValueError(f'Puzzle line holds a character other than . and '
+                         f'{SYMBOLS[:size]}') from None
+    return grid
@@ -7,11 +7,27 @@ Sudoku Puzzle creator
 @author: Jack Rawlinson
 """
 
-import numpy as np
+import logging
+import os
+import queue
+import threading
+
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
 
+from Sudoku_Format import grid_to_line
+from Sudoku_Hints import Hint_Engine
+from Sudoku_Live_Board import Live_Board
+from Sudoku_Masks import DIGITS
+from Sudoku_Metrics import METRICS
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Ready made puzzles are kept here between runs
+POOL_PATH = os.path.join(os.path.expanduser("~"), ".sudoku_pool.json")
+
 class Sudoku_Grid_GUI:
     """
     Creates the window for users to access the sudoku grid
@@ -41,31 +57,26 @@ class Sudoku_Grid_GUI:
 
     def gui_config(self):
         """
-        Fills window with a Sudoku grid from grid_layout
+        Fills window with a Sudoku grid
 
-        Parameters
-        ----------
-        grid_layout : 3-D numpy array
-          grid_layout[:,:,0] - Contains the real value in each cell 
-          grid_layout[:,:,1] - Once a valid grid is created this will store a solvable grid
-            for user to complete 
-          grid_layout[:,:,x+1] - Conains map of 1's & 0's informing function if it is possible 
-            for a cell to contain the number x, in following with sudoku rules.
-        build_window : tkinter parent window 
-          parent window which will showcase the widgets created in this function
+        The grids are stored as 81 cell values in row order:
+          self.solution - Contains the real value in each cell
+          self.puzzle - Board of the clues shown for the current difficulty, 0 if empty
 
         Returns
         -------
         None.
 
         """
-        print("Setting GUI")
+        logger.debug("Setting GUI")
         # Frame used in attempt to create sudoku boxes
         #label_frame = tk.Frame(self.window, relief="solid", bd=2, bg="white")
         self.entry_grid = [[0 for i in range(9)] for j in range(9)]
 
         # Validation command for entry boxes, resticts inputs to only ints
         self.vcmd = self.window.register(self.callback)
+        # The 81 cells are created once, new puzzles only update them
+        self.build_visual_grid()
 
         # Creating combo box to set the difficulty of the puzzle
         difficulties = ["Easy", "Medium", "Hard"]
@@ -77,27 +88,60 @@ class Sudoku_Grid_GUI:
         # Link box action to set_difficulty function
         self.difficulty_widget.bind("<<ComboboxSelected>>", self.set_difficulty)
 
-        # Generate sudoku grid
-        self.complete_grid_generator()
-
-        # self.set_visual_grid()
-
         # Check answer button
         tk.Button(self.window, text="Check answer",
                   command=self.check_answer).grid(row=10, column=0)
         # Button to generate and show a new puzzle without closing application
-        tk.Button(self.window, text="Generate new grid",
-                  command=self.generate_new_grid).grid(row=10, column=1, columnspan=2)
+        self.generate_button = tk.Button(self.window, text="Generate new grid",
+                                         command=self.generate_new_grid)
+        self.generate_button.grid(row=10, column=1, columnspan=2)
         # Changes background colour of all incorrect boxes to red
         tk.Button(self.window, text="Show mistakes",
                   command=self.show_errors).grid(row=10, column=3)
 
+        # Progress bar and cancel button, only shown while a puzzle is being generated
+        self.progress = ttk.Progressbar(self.window, mode="indeterminate")
+        self.progress.grid(row=11, column=0, columnspan=6, sticky="ew")
+        self.cancel_button = tk.Button(self.window, text="Cancel", command=self.cancel_generation)
+        self.cancel_button.grid(row=11, column=6, columnspan=2)
+        self.progress.grid_remove()
+        self.cancel_button.grid_remove()
+
+        # Next step hint, explained underneath the grid
+        tk.Button(self.window, text="Hint", command=self.show_hint).grid(row=10, column=8)
+        self.pencil_marks_shown = tk.BooleanVar(self.window, value=False)
+        tk.Checkbutton(self.window, text="Pencil marks", variable=self.pencil_marks_shown,
+                       command=self.update_pencil_marks).grid(row=11, column=8)
+        self.hint_label = tk.Label(self.window, text="", anchor="w", justify="left",
+                                   wraplength=600)
+        self.hint_label.grid(row=12, column=0, columnspan=9, sticky="ew")
+
+        # Grids of the current puzzle, None until the first one is ready
+        self.easy_grid = None
+        self.medium_grid = None
+        self.hard_grid = None
+        # Puzzles (or errors) from the worker thread with the cancel event of their request
+        self.results = queue.Queue()
+        # Cancel event of the generation in progress, None when idle
+        self.generating = None
+
+        # The puzzle pool (and with it numpy and the generator) is loaded by the
+        # first generation on the worker thread, so the window shows straight away
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.complete_grid_generator()
+
         # Allow frame to expand with window tab
         #label_frame.pack(fill=tk.BOTH, expand=1, padx=20, pady=20)
 
-    def set_visual_grid(self):
+    def build_visual_grid(self):
         """
-        Set up the Sudoku grid in the GUI
+        Creates the 81 empty cells of the Sudoku grid in the GUI
+
+        Each cell's text lives in a StringVar, and self.cell_values mirrors the
+        text of every cell so updates can skip cells that already show the
+        right value without asking Tcl.
 
         Returns
         -------
@@ -105,7 +149,28 @@ class Sudoku_Grid_GUI:
 
         """
         self.colours = ["white", "light blue"]
-        # Create and fill 9x9 grid
+        self.cell_vars = [None] * 81
+        self.cell_values = [""] * 81
+        # True for cells showing a given clue, which are disabled
+        self.given = [False] * 81
+        # Cells shown as mistakes, their background is not their box colour
+        self.recoloured = set()
+        # Cell text -> indices of the cells showing it, kept up to date by cell_changed
+        self.digit_cells = {}
+        # Cells currently highlighted gold
+        self.highlighted = set()
+        # Digit counts, mistakes and clashes of the cells, updated on every edit
+        self.board = Live_Board()
+        # Set while a puzzle is being shown, so only the player's edits give feedback
+        self.updating = False
+        # Pencil mark candidates and hints, updated on every edit
+        self.hints = Hint_Engine()
+        # Cells coloured by the last hint
+        self.hinted = set()
+        # Small labels showing the candidates of empty cells, created when first shown
+        self.pencil_labels = [None] * 81
+        self.pencil_text = [""] * 81
+        # Create 9x9 grid
         for row_start in range(3):
             row_start *= 3
             #build_window.rowconfigure(i, weight=100)
@@ -114,7 +179,87 @@ class Sudoku_Grid_GUI:
                 # Use entry boxes as cells
                 colour_index = (row_start + column_start) % 2
                 self.create_3x3_box(row_start, column_start, self.colours[colour_index])
-        print("Leaving set_visual_grid")
+        # Text colours of the player's numbers and given clues, put back when they stop clashing
+        self.text_colour = self.entry_grid[0][0].cget("foreground")
+        self.given_colour = self.entry_grid[0][0].cget("disabledforeground")
+
+    def set_visual_grid(self):
+        """
+        Shows self.puzzle in the grid, only touching cells that change
+
+        Returns
+        -------
+        None.
+
+        """
+        self.updating = True
+        with METRICS.timer("render"):
+            for index, number in enumerate(self.puzzle):
+                given = number != 0
+                if given != self.given[index]:
+                    # Disable editing of initial values
+                    self.entry_grid[index // 9][index % 9].config(
+                        state="disabled" if given else "normal")
+                    self.given[index] = given
+                # Given cells show their value, the rest start empty
+                text = str(number) if given else ""
+                if text != self.cell_values[index]:
+                    self.cell_vars[index].set(text)
+            # Put back the box colour of cells marked on the last puzzle
+            for index in self.recoloured | self.highlighted | self.hinted:
+                colour = self.cell_colour(index)
+                self.entry_grid[index // 9][index % 9].config(bg=colour, disabledbackground=colour)
+            self.recoloured.clear()
+            self.highlighted.clear()
+            self.hinted.clear()
+            self.hint_label.config(text="")
+            self.hints.reset(self.puzzle, self.solution)
+            self.update_pencil_marks()
+        self.updating = False
+        METRICS.maybe_emit()
+
+    def cell_colour(self, index):
+        """
+        Background colour of a cell, alternating between 3x3 boxes
+        """
+        return self.colours[(index // 27 + index % 9 // 3) % 2]
+
+    def cell_changed(self, index):
+        """
+        Keeps self.cell_values, self.digit_cells and self.board in step with a
+        cell's StringVar, colours cells that start or stop clashing with a peer
+        and stops the timer once the player completes the board
+
+        Parameters
+        ----------
+        index : Int
+          Cell index in row order.
+
+        Returns
+        -------
+        None.
+
+        """
+        old = self.cell_values[index]
+        new = self.cell_vars[index].get()
+        if old:
+            self.digit_cells[old].discard(index)
+        if new:
+            self.digit_cells.setdefault(new, set()).add(index)
+        self.cell_values[index] = new
+
+        for cell in self.board.set(index, int(new) if new else 0):
+            # Clashing numbers are shown in red while typing
+            if cell in self.board.conflicts:
+                self.entry_grid[cell // 9][cell % 9].config(fg="red", disabledforeground="red")
+            else:
+                self.entry_grid[cell // 9][cell % 9].config(
+                    fg=self.text_colour, disabledforeground=self.given_colour)
+        if not self.updating:
+            self.hints.set(index, int(new) if new else 0)
+            self.update_pencil_marks()
+            if self.incomplete and self.board.solved:
+                self.solved()
 
     def create_3x3_box(self, row_start, column_start, colour):
         """
@@ -137,15 +282,20 @@ class Sudoku_Grid_GUI:
         # Cerate new frame for 3x3 box
         frame = tk.Frame(self.window, relief="groove", bd=2,
                          bg=colour).grid(row=row_start, column=column_start)
-        print("Creating frames")
         for row_itr in range(3):
             for column_itr in range(3):
                 # Calculate index of current cell
                 row_index = row_start + row_itr
                 column_index = column_start + column_itr
 
+                index = row_index*9 + column_index
+                self.cell_vars[index] = tk.StringVar(self.window)
+                self.cell_vars[index].trace_add(
+                    "write", lambda *args, index=index: self.cell_changed(index))
+
                 entry = tk.Entry(frame, width=5, justify='center', font=(
-                    'Arial', 18), bg=colour,  validate="all", validatecommand=(self.vcmd, "%P"))  
+                    'Arial', 18), bg=colour, disabledbackground=colour, validate="all",
+                    validatecommand=(self.vcmd, "%P"), textvariable=self.cell_vars[index])
                 # Store entries
                 self.entry_grid[row_index][column_index] = entry
                 entry.grid(row=row_index, column=column_index, padx=5, pady=5)
@@ -153,14 +303,9 @@ class Sudoku_Grid_GUI:
                 entry.bind("<Down>", self.navigation)
                 entry.bind("<Left>", self.navigation)
                 entry.bind("<Right>", self.navigation)
-
-                # Pre-fill the entry with the initial value from the board if not zero
-                if self.grid[1, row_index, column_index] != 0:
-                    entry.insert(0, int(self.grid[1, row_index, column_index]))
-                    # Disable editing of initial values
-                    entry.config(state='disabled', disabledbackground=colour)
-                    entry.bind("<Button-1>", self.highlight_cells_click)
-        print("Created frames")
+                # Clicking a given clue highlights the cells with the same number
+                entry.bind("<Button-1>", lambda event, index=index: self.highlight_cells_click(index)
+                           if self.given[index] else None)
 
     def navigation(self, event):
         """
@@ -207,65 +352,58 @@ class Sudoku_Grid_GUI:
         None.
 
         """
-        print(f'Button press event: {event}')
+        logger.debug("Key press event: %s", event)
         # Don't highlight cells if directional keys are used
         if(not(event.keysym in ("Up", "Down", "Left", "Right"))):
-          for row_itr in range(9):
-              for column_itr in range(9):
-                  cell_colour = self.entry_grid[row_itr][column_itr]["background"]
-                  # Reset all gold
-                  if(cell_colour == "gold"):
-                      # Define position of box containing cell
-                      box_row = np.floor(row_itr / 3)
-                      box_column = np.floor(column_itr / 3)
-                      colour_index = int((box_row + box_column) % 2)
-
-                      # Reset cell to its original colour
-                      self.entry_grid[row_itr][column_itr].config(
-                          bg=self.colours[colour_index], disabledbackground=self.colours[colour_index])
-
-                  # Set any cells with the same number as key pressed to gold as well as current cell
-                  if (self.entry_grid[row_itr][column_itr].get() == event.char):
-                      self.entry_grid[row_itr][column_itr].config(
-                          bg="gold", disabledbackground="gold")
-
-    def highlight_cells_click(self, event):
+            self.highlight(event.char)
+
+    def highlight_cells_click(self, index):
         """
-        Function to override key press event and will highlight all cells with the same number as the key presssed.
+        Highlights all cells with the same number as a clicked cell
 
         Parameters
         ----------
-        event : Tkinter event
-          Tkinter key press event
+        index : Int
+          Cell index in row order of the clicked cell.
 
         Returns
         -------
         None.
 
         """
-        print(f'Button press event: {event.widget.get()}')
-        for row_itr in range(9):
-            for column_itr in range(9):
-                cell_colour = self.entry_grid[row_itr][column_itr]["background"]
-                # Reset all gold
-                if(cell_colour == "gold"):
-                    # Define position of box containing cell
-                    box_row = np.floor(row_itr / 3)
-                    box_column = np.floor(column_itr / 3)
-                    colour_index = int((box_row + box_column) % 2)
+        logger.debug("Click on cell holding %s", self.cell_values[index])
+        self.highlight(self.cell_values[index])
+
+    def highlight(self, text):
+        """
+        Turns the cells showing text gold and resets the previously gold cells
+
+        Only cells whose colour changes are configured, found through
+        self.digit_cells rather than by reading every Entry.
+
+        Parameters
+        ----------
+        text : String
+          Cell text to highlight, nothing is highlighted for text no cell holds.
 
-                    # Reset cell to its original colour
-                    self.entry_grid[row_itr][column_itr].config(
-                        bg=self.colours[colour_index], disabledbackground=self.colours[colour_index])
+        Returns
+        -------
+        None.
 
-                # Set any cells with the same number as key pressed to gold as well as current cell
-                if (self.entry_grid[row_itr][column_itr].get() == event.widget.get()):
-                    self.entry_grid[row_itr][column_itr].config(
-                        bg="gold", disabledbackground="gold")
+        """
+        cells = set(self.digit_cells.get(text, ()))
+        for index in self.highlighted - cells:
+            # Reset cell to its original colour
+            colour = self.cell_colour(index)
+            self.entry_grid[index // 9][index % 9].config(bg=colour, disabledbackground=colour)
+            self.recoloured.discard(index)
+        for index in cells - self.highlighted:
+            self.entry_grid[index // 9][index % 9].config(bg="gold", disabledbackground="gold")
+        self.highlighted = cells
 
     def callback(self, P):
         """
-        Validation function in order to restrict inputs to only numbers
+        Validation function in order to restrict inputs to a single number 1-9
 
         Parameters
         ----------
@@ -278,7 +416,7 @@ class Sudoku_Grid_GUI:
           Results of validation
 
         """
-        if str.isdigit(P) or P == "":
+        if P == "" or (len(P) == 1 and P in "123456789"):
             return True
         else:
             return False
@@ -292,10 +430,8 @@ class Sudoku_Grid_GUI:
         None.
 
         """
-        print("IN GENERATE NEW GRID")
+        # The grid is updated once the puzzle arrives
         self.complete_grid_generator()
-        self.set_visual_grid()
-        print("lEAVING GENERATE NEW GRID")
 
     def set_difficulty(self, selection):
         """
@@ -311,34 +447,45 @@ class Sudoku_Grid_GUI:
         None.
 
         """
-        print("In SET DIFFICULTY")
         # Update difficulty when combobx is used
 
         self.difficulty = self.difficulty_widget.get()
+        if self.hard_grid is None:
+            # No puzzle yet, the first one will be shown at this difficulty
+            return
 
         # Assume hard difficulty to begin to cut down of if statements
-        self.grid[1, :, :] = np.copy(self.hard_grid)
+        self.puzzle = self.hard_grid
 
         if self.difficulty_widget.get() == "Easy":
-            print("Setting to easy")
             #self.difficulty = "Easy"
-            self.grid[1, :, :] = np.copy(self.easy_grid)
+            self.puzzle = self.easy_grid
 
         if self.difficulty_widget.get() == "Medium":
-            print("setting to medium")
             #self.difficulty = "Medium"
-            self.grid[1, :, :] = np.copy(self.medium_grid)
+            self.puzzle = self.medium_grid
 
         # Update grid
         self.set_visual_grid()
-        print(f'EASY GRID : \n{self.easy_grid}')
-        print(f'MEDIUM GRID : \n{self.medium_grid}')
-        print(f'HARD GRID : \n{self.hard_grid}')
-        print("LEAVING SET DIFFICULTY")
-        print(f'Diffculty = {self.difficulty}')
-        # print(f'Entry grid = {self.entry_grid}')
-        # print(f'Entry grid = {self.entry_grid[0]}')
-        # print(f'Entry grid = {self.entry_grid[0][0].get()}')
+        # A new puzzle is on the board, time it from the start and detect its completion again
+        self.reset_timer()
+        logger.debug("Showing %s grid %s", self.difficulty, grid_to_line(self.puzzle))
+
+    def close(self):
+        """
+        Saves the puzzle pool for next time and closes the window
+
+        Returns
+        -------
+        None.
+
+        """
+        if self.generating is not None:
+            self.generating.set()
+        with self.pool_lock:
+            if self.pool is not None:
+                self.pool.close(timeout=1)
+        self.window.destroy()
 
     def create_timer(self):
         """
@@ -359,7 +506,24 @@ class Sudoku_Grid_GUI:
         # Itterator statement for timer
         self.incomplete = True
 
-        self.window.after(1000, self.update_timer)
+        self.timer_job = self.window.after(1000, self.update_timer)
+
+    def reset_timer(self):
+        """
+        Restarts the clock from 00:00, also after a solved puzzle stopped it
+
+        Returns
+        -------
+        None.
+
+        """
+        # Cancel the pending tick so there is never more than one running
+        self.window.after_cancel(self.timer_job)
+        self.seconds = 0
+        self.minutes = 0
+        self.incomplete = True
+        self.timer_variable.config(text="00:00")
+        self.timer_job = self.window.after(1000, self.update_timer)
 
     def update_timer(self):
         """
@@ -379,7 +543,7 @@ class Sudoku_Grid_GUI:
 
         self.timer_variable.config(text=f'{self.minutes:02d}:{self.seconds:02d}')
         if self.incomplete:
-            self.window.after(1000, self.update_timer)
+            self.timer_job = self.window.after(1000, self.update_timer)
 
     def check_answer(self):
         """
@@ -390,26 +554,29 @@ class Sudoku_Grid_GUI:
         None.
 
         """
-        try:
-            correct_answers = 0
-            for row_itr in range(9):
-                for column_itr in range(9):
-                    # Note when value in entry display matches the correct grid
-
-                    if int(self.grid[0, row_itr, column_itr]) == int(self.entry_grid[row_itr][column_itr].get()):
-                        correct_answers += 1
-
-            if correct_answers == 81:
-                messagebox.showinfo(
-                    "Success", f'You completed it!!!! \nTime to complete : {self.minutes} minutes {self.seconds} seconds')
-                # Update that sudoku is solved to stop timer
-                self.incomplete = False
-            else:
-                messagebox.showinfo(
-                    "Fail", f'There is a mistake somewhere :(, Correct answers = {correct_answers})')
-        # To catch when nothing is entered
-        except Exception:
+        if self.board.empty:
             messagebox.showerror("Error", "Please fill all cells with intergers 1-9")
+        elif self.board.solved:
+            self.solved()
+        else:
+            correct_answers = 81 - len(self.board.wrong)
+            messagebox.showinfo(
+                "Fail", f'There is a mistake somewhere :(, Correct answers = {correct_answers})')
+
+    def solved(self):
+        """
+        Stops the timer and congratulates the player
+
+        Returns
+        -------
+        None.
+
+        """
+        # Update that sudoku is solved to stop timer, without the tick already pending
+        self.incomplete = False
+        self.window.after_cancel(self.timer_job)
+        messagebox.showinfo(
+            "Success", f'You completed it!!!! \nTime to complete : {self.minutes} minutes {self.seconds} seconds')
 
     def show_errors(self):
         """
@@ -420,237 +587,236 @@ class Sudoku_Grid_GUI:
         None.
 
         """
-        for row_itr in range(9):
-            for column_itr in range(9):
-                # Try except catch empty cells
-                try:
-                    # If cell value doesn't match completed grid then change it to red
-                    if int(self.grid[0, row_itr, column_itr]) != int(self.entry_grid[row_itr][column_itr].get()):
-                        #print("seen a mistake ")
-                        self.entry_grid[row_itr][column_itr].config(bg="red")
-                    #print("Leaving show errors")
-                except:
-                    #print("Seen as a NaN, In show errors")
-                    self.entry_grid[row_itr][column_itr].config(bg="red")
+        for index in self.board.empty | self.board.wrong:
+            self.entry_grid[index // 9][index % 9].config(bg="red")
+            self.recoloured.add(index)
+            self.highlighted.discard(index)
+
+    def show_hint(self):
+        """
+        Explains the next logical step and colours the cells it is about
+
+        Returns
+        -------
+        None.
+
+        """
+        for index in self.hinted:
+            colour = self.cell_colour(index)
+            self.entry_grid[index // 9][index % 9].config(bg=colour, disabledbackground=colour)
+        with METRICS.timer("hint"):
+            hint = self.hints.hint()
+        logger.debug("Hint %s", hint)
+        self.hinted = hint.cells
+        for index in self.hinted:
+            colour = "light green" if index == hint.index else "khaki"
+            self.entry_grid[index // 9][index % 9].config(bg=colour, disabledbackground=colour)
+            self.highlighted.discard(index)
+        self.hint_label.config(text=hint.explanation)
+        # Candidates removed by the hint disappear from the pencil marks
+        self.update_pencil_marks()
+
+    def update_pencil_marks(self):
+        """
+        Shows the candidates of every empty cell in small print at the top of
+        the cell, or hides them when pencil marks are switched off
+
+        Only labels whose text changes are touched.
+
+        Returns
+        -------
+        None.
+
+        """
+        shown = self.pencil_marks_shown.get()
+        if not shown and not any(self.pencil_text):
+            return
+        marks = self.hints.pencil_marks() if shown else [0] * 81
+        for index, mask in enumerate(marks):
+            text = "".join(map(str, DIGITS[mask]))
+            if text == self.pencil_text[index]:
+                continue
+            self.pencil_text[index] = text
+            label = self.pencil_labels[index]
+            if label is None:
+                entry = self.entry_grid[index // 9][index % 9]
+                label = tk.Label(self.window, font=("Arial", 7), fg="grey40",
+                                 bg=self.cell_colour(index), bd=0, padx=0, pady=0)
+                # Clicking the marks types into the cell underneath
+                label.bind("<Button-1>", lambda event, entry=entry: entry.focus_set())
+                self.pencil_labels[index] = label
+            if text:
+                label.config(text=text)
+                label.place(in_=self.entry_grid[index // 9][index % 9], relx=0.5, y=1,
+                            anchor="n")
+            else:
+                label.place_forget()
 
     def complete_grid_generator(self):
         """
-        Cycles through every cell in the sudoku grid and assigns a valid number
+        Starts taking a new puzzle from the pool on a worker thread, graded so
+        that the current difficulty's grid really needs techniques of that
+        difficulty
+
+        The window keeps responding while the pool has to generate one, and
+        poll_results shows the puzzle when it arrives.
 
-        Parameters
-        ----------
-        grid_layout : 3-D numpy array
-          grid_layout[:,:,0] - Contains the real value in each cell 
-          grid_layout[:,:,1] - Once a valid grid is created this will store a solvable grid
-            for user to complete 
-          grid_layout[:,:,x+1] - Conains map of 1's & 0's informing function if it is possible 
-            for a cell to contain the number x, in following with sudoku rules.
         Returns
         -------
-        grid_layout : 3-D numpy array
-          Array containing the completed sudoku grid.
-
-        """
-        # Create empty sudoku grid
-        self.grid = np.zeros((11, 9, 9))
-
-        # Fill probility grids for each possible number
-        for number in range(2, 11):
-            self.grid[number, :, :] = 1
-
-        # Set initial starting position
-        row = 0
-        collumn = 0
-        resets = 0
-        grid_incomplete = True
-        start_of_row = False
-        # Create a deep copy for use if code gets stuck for options at the end of a row
-        grid_memory = np.copy(self.grid)
-        # Iterate over each cell
-
-        while grid_incomplete:
-
-            # If grid not fixed after 3 atempts then completely reset the grid
-            if resets == 3:
-                # Create empty sudoku grid
-                self.grid = np.zeros((11, 9, 9))
-
-                # Fill probility grids for each possible number
-                for number in range(2, 11):
-                    self.grid[number, :, :] = 1
-
-                # Set initial starting position
-                row = 0
-                collumn = 0
-                resets = 0
-                grid_incomplete = True
-                start_of_row = False
-
-            # 1-d array of probabilities for each number in a cell
-            probailities = self.get_cell_probabilites(row, collumn)
-            print("Getting initial probs for cell")
-
-            # Save configureation at the start of a new row
-            if start_of_row:
-                start_of_row = False
-                resets = 0
-                grid_memory = np.copy(self.grid)
-
-            # Check for NaNs, if found then reset current row
-            # This is repeated until a valid row is created
-
-            if np.isnan(probailities[0]):
-                collumn = 0
-                print(f'Issue grid \n{self.grid[0,:,:]}')
-                # Reset using memory
-                # Hard copy used to avoid memory corruption
-                self.grid = np.copy(grid_memory)
-                # Update probability array
-                probailities = self.get_cell_probabilites(row, collumn)
-                resets += 1
-                print("Reset grid")
-                print(f'Issue row = {row}')
-
-            # Assign the cell a number between 1 and 9
-            cell_value = np.random.choice(range(1, 10), 1, p=probailities)
-            self.grid[0, row, collumn] = int(cell_value)
-
-            # Reset the probability maps in accordance to this new cell number
-            self.set_probabilities(cell_value+1, row, collumn)
-
-            # Update current collumn position
-            collumn += 1
-
-            # End code if in final cell
-            if collumn == 9 and row == 8:
-                #print("------------- IN FINAL CELL ---------------")
-                grid_incomplete = False
-
-            # Move to new row at end of current one
-            if collumn == 9:
-                row += 1
-                collumn = 0
-                start_of_row = True
-
-        print("SUCCESSFUL GRID : ")
-        print(self.grid[0, :, :])
-        # Set interator now for use in solvable grid function
-        self.filled_cells = 0
-        self.solvable_grid()
-
-    def get_cell_probabilites(self, row, collumn):
-        """
-        Cylces through the grid_layout probability maps to create 
-          1-d array of probabilities for the current cell choice.
+        None.
+
+        """
+        if self.generating is not None:
+            return
+        self.generating = threading.Event()
+        threading.Thread(target=self.generation_worker, args=(self.difficulty, self.generating),
+                         name="Sudoku_Generation", daemon=True).start()
+        self.generate_button.config(state="disabled")
+        self.progress.grid()
+        self.cancel_button.grid()
+        self.progress.start()
+        self.window.after(50, self.poll_results)
+
+    def generation_worker(self, difficulty, cancel):
+        """
+        Worker thread body, hands the puzzle to the Tk thread through self.results
 
         Parameters
         ----------
-        grid_layout : 3-D numpy array
-          grid_layout[:,:,0] - Contains the real value in each cell 
-          grid_layout[:,:,1] - Once a valid grid is created this will store a solvable grid
-            for user to complete 
-          grid_layout[:,:,x+1] - Conains map of 1's & 0's informing function if it is possible 
-            for a cell to contain the number x, in following with sudoku rules.
-        row : Int
-          Current row index.
-        collumn : Int
-          Current collumn index.
+        difficulty : String
+          Difficulty the puzzle is graded for.
+        cancel : threading.Event
+          Set to stop generating.
+
+        Returns
+        -------
+        None.
+
+        """
+        from Sudoku_Engine import Generation_Cancelled
+
+        try:
+            # Don't load the pool for a request cancelled while waiting, e.g. on close
+            if cancel.is_set():
+                raise Generation_Cancelled()
+            self.results.put((cancel, self.puzzle_pool().pop(difficulty, cancel)))
+        except Generation_Cancelled:
+            logger.info("Generation cancelled")
+        except Exception as error:
+            # Tk may only be used from its own thread, so report the error there
+            logger.exception("Generation failed")
+            self.results.put((cancel, error))
+
+    def puzzle_pool(self):
+        """
+        Puzzle pool, loaded and started on first use from a worker thread
+
+        Returns
+        -------
+        pool : Puzzle_Pool
+
+        """
+        with self.pool_lock:
+            if self.pool is None:
+                from Sudoku_Pool import Puzzle_Pool
+
+                self.pool = Puzzle_Pool(path=POOL_PATH)
+                self.pool.start()
+            return self.pool
+
+    def poll_results(self):
+        """
+        Shows a puzzle from the worker thread once it is ready, checking again later if not
+
+        Returns
+        -------
+        None.
+
+        """
+        while True:
+            try:
+                cancel, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            # Results of cancelled requests are dropped
+            if cancel is not self.generating:
+                continue
+            self.generation_finished()
+            if isinstance(result, Exception):
+                messagebox.showerror("Error", f'Could not generate a puzzle: {result}')
+            else:
+                self.show_puzzle(result)
+        if self.generating is not None:
+            self.window.after(50, self.poll_results)
+
+    def cancel_generation(self):
+        """
+        Stops the generation in progress and keeps the current puzzle
 
         Returns
         -------
-        probs : 1-D numpy array
-          1-D array of probabilites for the current cell.
+        None.
 
         """
+        if self.generating is not None:
+            self.generating.set()
+            self.generation_finished()
 
-        probs = np.zeros(9)
+    def generation_finished(self):
+        """
+        Hides the progress bar and allows new puzzles to be requested again
 
-        for i in range(9):
-            probs[i] = self.grid[i+2, row, collumn]
-        total = sum(probs)
-        # Set equal probability for each possible number
-        probs = probs * (1/total)
-        print("leaving get probs")
-        return probs
+        Returns
+        -------
+        None.
 
-    def set_probabilities(self, number, row, collumn):
         """
-        Updates probability map in accordance with the latest cell value 
+        self.generating = None
+        self.progress.stop()
+        self.progress.grid_remove()
+        self.cancel_button.grid_remove()
+        self.generate_button.config(state="normal")
+
+    def show_puzzle(self, puzzle):
+        """
+        Shows a new puzzle from the pool
 
         Parameters
         ----------
-        number : Int
-          Value that has just been placed into cell
-        grid_layout : 3-D numpy array
-          grid_layout[:,:,0] - Contains the real value in each cell 
-          grid_layout[:,:,1] - Once a valid grid is created this will store a solvable grid
-            for user to complete 
-          grid_layout[:,:,x+1] - Conains map of 1's & 0's informing function if it is possible 
-            for a cell to contain the number x, in following with sudoku rules.
-        row : Int
-          Current row index.
-        collumn : int
-          Current collumn index
+        puzzle : Sudoku_Puzzle
+          Puzzle taken from the pool.
 
         Returns
         -------
         None.
 
         """
-        # Set current row and collumn probabilities to 0 in the map of the cell value
-        self.grid[number, :, collumn] = 0
-        self.grid[number, row, :] = 0
-        # Locate the 3x3 box where cell is situated
-        box_row = int(np.floor(row/3)) * 3
-        box_collumn = int(np.floor(collumn/3))*3
-        # Set probabilites in box to 0
-        for current_row in range(3):
-            cell_row = box_row + current_row
-            for current_collumn in range(3):
-                cell_collumn = box_collumn + current_collumn
-                self.grid[number, cell_row, cell_collumn] = 0
+        self.solution = puzzle.solution
+        self.board.set_solution(self.solution)
+        # Show the puzzle ID so it can be shared and regenerated
+        self.window.title(f'Sudoku - {puzzle.id}' if puzzle.id else "Sudoku")
+        logger.info("New puzzle %s", puzzle.id)
+        logger.debug("Solution %s", grid_to_line(self.solution))
+        self.solvable_grid(puzzle)
 
-    def solvable_grid(self):
+    def solvable_grid(self, puzzle):
         """
-        Creates solvable sudoku grid using the complete grid 
+        Stores the solvable grid for each difficulty from a generated puzzle
 
         Parameters
         ----------
-        grid_layout : 3-D numpy array
-          grid_layout[:,:,0] - Contains the real value in each cell 
-          grid_layout[:,:,1] - Once a valid grid is created this will store a solvable grid
-            for user to complete 
-          grid_layout[:,:,x+1] - Conains map of 1's & 0's informing function if it is possible 
-            for a cell to contain the number x, in following with sudoku rules.
+        puzzle : Sudoku_Puzzle
+          Puzzle created by the engine.
 
         Returns
         -------
-        grid_layout : 3-D numpy array
-          grid_layout[:,:,0] - Contains the real value in each cell 
-          grid_layout[:,:,1] - Once a valid grid is created this will store a solvable grid
-            for user to complete 
-          grid_layout[:,:,x+1] - Conains map of 1's & 0's informing function if it is possible 
-            for a cell to contain the number x, in following with sudoku rules.
-        """
-        # Iterator to track number of filled cells
-        print("FILLING SOLVABLE GRID")
-        while self.filled_cells < 61:
-            # Choose random cell to show value of
-            row_value = np.random.choice(range(9), 1)
-            column_value = np.random.choice(range(9), 1)
-            # Check that this cell does not already showcase a correct value
-            if self.grid[1, row_value, column_value] == 0:
-                self.grid[1, row_value, column_value] = self.grid[0, row_value, column_value]
-                # Update iterator
-                self.filled_cells += 1
-            # Save configureations of the grid for different difficulties
-            if self.filled_cells == 17:
-                self.hard_grid = np.copy(self.grid[1, :, :])
-            if self.filled_cells == 39:
-                self.medium_grid = np.copy(self.grid[1, :, :])
-
-        print("SET SOLVABLE GRID")
-        self.easy_grid = np.copy(self.grid[1, :, :])
+        None.
+
+        """
+        self.easy_grid = puzzle.board("Easy")
+        self.medium_grid = puzzle.board("Medium")
+        self.hard_grid = puzzle.board("Hard")
+        logger.debug("Grades %s", puzzle.grades)
         # Call set_difficulty so that difficulty level is kept constant when generating new grids
         self.set_difficulty(self.difficulty)
 
@@ -0,0 +1,554 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:34:10 2026
+
+Technique based difficulty grader
+
+Solves a puzzle the way a person would, always using the cheapest technique
+that makes progress, and rates it by the hardest technique needed. Ratings
+follow the Sudoku Explainer scale.
+
+Candidates are updated incrementally: placing a number only touches the
+cell's peers, singles are queued as soon as they appear and the unit based
+techniques only rescan units whose candidates changed since their last scan.
+X-Wing only searches from rows and collumns that changed, and XY-Wing only
+around cells that became bivalue, since the last search.
+
+@author: Jack Rawlinson
+"""
+
+from itertools import combinations
+
+from Sudoku_Masks import BOX_OF, COL_OF, DIGITS, FULL_MASK, PEERS, POPCOUNT, ROW_OF
+
+# The 27 units: rows 0-8, collumns 9-17 and boxes 18-26
+UNITS = (tuple(tuple(row * 9 + collumn for collumn in range(9)) for row in range(9))
+         + tuple(tuple(row * 9 + collumn for row in range(9)) for collumn in range(9))
+         + tuple(tuple((box // 3) * 27 + (box % 3) * 3 + (cell // 3) * 9 + cell % 3
+                       for cell in range(9)) for box in range(9)))
+# Row, collumn and box unit of every cell
+CELL_UNITS = tuple((ROW_OF[index], 9 + COL_OF[index], 18 + BOX_OF[index]) for index in range(81))
+
+# Technique ratings, in the order they are tried
+TECHNIQUES = {
+    "Hidden single": 1.5,
+    "Naked single": 2.3,
+    "Pointing": 2.6,
+    "Claiming": 2.8,
+    "Naked pair": 3.0,
+    "X-Wing": 3.2,
+    "Hidden pair": 3.4,
+    "Naked triple": 3.6,
+    "XY-Wing": 4.2,
+}
+# Rating given to a puzzle that needs more than the techniques above
+UNSOLVED_RATING = 10.0
+
+# Highest rating of each difficulty
+DIFFICULTY_RATINGS = {"Easy": 1.5, "Medium": 2.8, "Hard": UNSOLVED_RATING}
+
+
+class Contradiction(Exception):
+    """
+    Raised when the candidates show the puzzle has no solution
+    """
+
+
+class Grade:
+    """
+    Result of grading a puzzle
+    """
+
+    def __init__(self, solved, rating, hardest, steps, uses):
+        """
+        Parameters
+        ----------
+        solved : Bool
+          True if the techniques solved the whole puzzle.
+        rating : Float
+          Rating of the hardest technique used, UNSOLVED_RATING if not solved.
+        hardest : String
+          Name of the hardest technique used.
+        steps : Int
+          Number of deductions made.
+        uses : Dict
+          Number of times each technique was used.
+
+        """
+        self.solved = solved
+        self.rating = rating
+        self.hardest = hardest
+        self.steps = steps
+        self.uses = uses
+
+    @property
+    def difficulty(self):
+        """
+        Difficulty name matching the rating
+        """
+        for difficulty, rating in DIFFICULTY_RATINGS.items():
+            if self.rating <= rating:
+                return difficulty
+        return "Hard"
+
+    def __repr__(self):
+        return (f'Grade(difficulty={self.difficulty!r}, rating={self.rating}, '
+                f'hardest={self.hardest!r}, steps={self.steps})')
+
+
+class Sudoku_Grader:
+    """
+    Logical solver keeping pencil mark candidates for every cell
+    """
+
+    def __init__(self, grid):
+        """
+        Parameters
+        ----------
+        grid : Sequence of 81 ints
+          Cell values in row order, 0 for an empty cell.
+
+        """
+        self.cells = bytearray(81)
+        # Candidates of every empty cell, 0 once the cell is filled
+        self.candidates = [FULL_MASK] * 81
+        # Numbers already placed in each unit
+        self.placed = [0] * 27
+        # Number of cells in each unit that can still hold each number
+        self.places = [[9] * 9 for _ in range(27)]
+        # Bumped on every change to a unit, so techniques can skip unchanged units
+        self.unit_version = [0] * 27
+        self.scanned = {technique: [-1] * 27 for technique in TECHNIQUES}
+        # Cells down to one candidate and (unit, number) pairs with one place left
+        self.naked_queue = []
+        self.hidden_queue = []
+        # Cells that became bivalue and rows and collumns that changed since
+        # XY-Wing and X-Wing last searched from them
+        self.new_pairs = set()
+        self.wing_lines = set()
+        # Mask of the positions of each number along each row and collumn,
+        # when the number has exactly two places left there, and the lines
+        # having each (rows or not, number, mask)
+        self.line_keys = [[0] * 9 for _ in range(18)]
+        self.lines_by_key = {}
+        self.steps = 0
+        self.uses = {}
+        # Technique name to the method applying it
+        self.methods = {
+            "Hidden single": self.hidden_single,
+            "Naked single": self.naked_single,
+            "Pointing": self.pointing,
+            "Claiming": self.claiming,
+            "Naked pair": self.naked_pair,
+            "X-Wing": self.x_wing,
+            "Hidden pair": self.hidden_pair,
+            "Naked triple": self.naked_triple,
+            "XY-Wing": self.xy_wing,
+        }
+        for index, number in enumerate(grid):
+            if number:
+                if not self.candidates[index] >> (number - 1) & 1:
+                    raise Contradiction(f'{number} repeated in the units of cell {index}')
+                self.place(index, number)
+
+    def eliminate(self, index, mask):
+        """
+        Removes candidates from a cell, queueing any singles this creates
+
+        Parameters
+        ----------
+        index : Int
+          Cell index in row order.
+        mask : Int
+          Candidates to remove.
+
+        Returns
+        -------
+        Bool
+          True if any candidate was removed.
+
+        """
+        mask &= self.candidates[index]
+        if not mask:
+            return False
+        remaining = self.candidates[index] & ~mask
+        self.candidates[index] = remaining
+        for unit in CELL_UNITS[index]:
+            self.unit_version[unit] += 1
+            places = self.places[unit]
+            for number in DIGITS[mask]:
+                places[number - 1] -= 1
+                if places[number - 1] == 1:
+                    self.hidden_queue.append((unit, number))
+                elif places[number - 1] == 0 and not self.placed[unit] >> (number - 1) & 1:
+                    raise Contradiction(f'No place left for {number} in unit {unit}')
+        if POPCOUNT[remaining] == 1:
+            self.naked_queue.append(index)
+        elif POPCOUNT[remaining] == 2:
+            self.new_pairs.add(index)
+        elif not remaining:
+            raise Contradiction(f'No candidates left in cell {index}')
+        return True
+
+    def place(self, index, number):
+        """
+        Fills a cell and removes the number from the candidates of its peers
+
+        Parameters
+        ----------
+        index : Int
+          Cell index in row order.
+        number : Int
+          Value between 1 and 9.
+
+        Returns
+        -------
+        None.
+
+        """
+        bit = 1 << (number - 1)
+        self.eliminate(index, self.candidates[index] & ~bit)
+        self.cells[index] = number
+        self.candidates[index] = 0
+        for unit in CELL_UNITS[index]:
+            self.placed[unit] |= bit
+            self.places[unit][number - 1] = 0
+            self.unit_version[unit] += 1
+        for peer in PEERS[index]:
+            if self.candidates[peer] & bit:
+                self.eliminate(peer, bit)
+
+    def record(self, technique):
+        """
+        Counts one use of a technique
+        """
+        self.steps += 1
+        self.uses[technique] = self.uses.get(technique, 0) + 1
+
+    def changed_units(self, technique, units=range(27)):
+        """
+        Yields the units whose candidates changed since technique last scanned them
+
+        A unit only counts as scanned once technique asks for the next one,
+        i.e. found nothing in it. A technique returns after its first
+        elimination, which may leave the unit itself unchanged (pointing and
+        claiming eliminate outside it) and more to find there.
+        """
+        scanned = self.scanned[technique]
+        for unit in units:
+            version = self.unit_version[unit]
+            if scanned[unit] != version:
+                yield unit
+                scanned[unit] = version
+
+    def hidden_single(self):
+        """
+        Places a number that has only one possible cell left in a unit
+        """
+        while self.hidden_queue:
+            unit, number = self.hidden_queue.pop()
+            bit = 1 << (number - 1)
+            if self.placed[unit] & bit:
+                continue
+            for index in UNITS[unit]:
+                if self.candidates[index] & bit:
+                    self.place(index, number)
+                    return True
+        return False
+
+    def naked_single(self):
+        """
+        Places the only candidate left in a cell
+        """
+        while self.naked_queue:
+            index = self.naked_queue.pop()
+            if not self.cells[index] and POPCOUNT[self.candidates[index]] == 1:
+                self.place(index, DIGITS[self.candidates[index]][0])
+                return True
+        return False
+
+    def pointing(self):
+        """
+        A number confined to one row or collumn inside a box is removed from
+        the rest of that row or collumn
+        """
+        for unit in self.changed_units("Pointing", range(18, 27)):
+            if self.box_line_elimination(unit, lines_of_box=True):
+                return True
+        return False
+
+    def claiming(self):
+        """
+        A number confined to one box inside a row or collumn is removed from
+        the rest of that box
+        """
+        for unit in self.changed_units("Claiming", range(18)):
+            if self.box_line_elimination(unit, lines_of_box=False):
+                return True
+        return False
+
+    def box_line_elimination(self, unit, lines_of_box):
+        """
+        Shared part of pointing and claiming for one unit
+
+        Parameters
+        ----------
+        unit : Int
+          Unit whose candidates are checked.
+        lines_of_box : Bool
+          True when unit is a box (pointing), False for a row or collumn (claiming).
+
+        Returns
+        -------
+        Bool
+          True if any candidate was removed.
+
+        """
+        for number in DIGITS[FULL_MASK & ~self.placed[unit]]:
+            bit = 1 << (number - 1)
+            cells = [index for index in UNITS[unit] if self.candidates[index] & bit]
+            if len(cells) < 2:
+                continue
+            if lines_of_box:
+                targets = set()
+                if len({ROW_OF[index] for index in cells}) == 1:
+                    targets.add(ROW_OF[cells[0]])
+                if len({COL_OF[index] for index in cells}) == 1:
+                    targets.add(9 + COL_OF[cells[0]])
+            else:
+                targets = {18 + BOX_OF[cells[0]]} if len({BOX_OF[index] for index in cells}) == 1 else set()
+            changed = False
+            for target in targets:
+                for index in UNITS[target]:
+                    if index not in cells and self.eliminate(index, bit):
+                        changed = True
+            if changed:
+                return True
+        return False
+
+    def naked_subset(self, technique, size):
+        """
+        size cells of a unit sharing exactly size candidates remove those
+        candidates from the rest of the unit
+        """
+        for unit in self.changed_units(technique):
+            empty = [index for index in UNITS[unit] if self.candidates[index]]
+            if len(empty) <= size:
+                continue
+            small = [index for index in empty if POPCOUNT[self.candidates[index]] <= size]
+            for group in combinations(small, size):
+                mask = 0
+                for index in group:
+                    mask |= self.candidates[index]
+                if POPCOUNT[mask] != size:
+                    continue
+                changed = False
+                for index in empty:
+                    if index not in group and self.eliminate(index, mask):
+                        changed = True
+                if changed:
+                    return True
+        return False
+
+    def naked_pair(self):
+        """
+        Two cells of a unit with the same two candidates
+        """
+        return self.naked_subset("Naked pair", 2)
+
+    def naked_triple(self):
+        """
+        Three cells of a unit with three candidates between them
+        """
+        return self.naked_subset("Naked triple", 3)
+
+    def hidden_pair(self):
+        """
+        Two numbers that can only go in the same two cells of a unit remove
+        every other candidate from those cells
+        """
+        for unit in self.changed_units("Hidden pair"):
+            places = self.places[unit]
+            numbers = [number for number in range(1, 10) if places[number - 1] == 2]
+            for first, second in combinations(numbers, 2):
+                pair = (1 << (first - 1)) | (1 << (second - 1))
+                cells = [index for index in UNITS[unit] if self.candidates[index] & pair]
+                if len(cells) != 2 or any(self.candidates[index] & pair != pair for index in cells):
+                    continue
+                changed = False
+                for index in cells:
+                    if self.eliminate(index, ~pair & FULL_MASK):
+                        changed = True
+                if changed:
+                    return True
+        return False
+
+    def x_wing(self):
+        """
+        A number with the same two possible collumns in two rows is removed
+        from the rest of those collumns, and the same with rows and collumns swapped
+
+        Cover units only ever lose candidates, so a new X-Wing needs one of its
+        two lines to have changed since the last search. Only the position
+        masks of those lines are recomputed, and only they are searched from.
+        """
+        for unit in self.changed_units("X-Wing", range(18)):
+            self.update_line_keys(unit)
+            self.wing_lines.add(unit)
+        for unit in sorted(self.wing_lines):
+            if self.x_wing_from(unit):
+                return True
+            # Nothing to find from this line until it changes again
+            self.wing_lines.discard(unit)
+        return False
+
+    def update_line_keys(self, unit):
+        """
+        Refreshes the position masks of a row or collumn and the lines_by_key index
+        """
+        keys = self.line_keys[unit]
+        places = self.places[unit]
+        for number in range(1, 10):
+            key = 0
+            if places[number - 1] == 2:
+                bit = 1 << (number - 1)
+                for position, index in enumerate(UNITS[unit]):
+                    if self.candidates[index] & bit:
+                        key |= 1 << position
+            old = keys[number - 1]
+            if key != old:
+                if old:
+                    self.lines_by_key[unit < 9, number, old].discard(unit)
+                if key:
+                    self.lines_by_key.setdefault((unit < 9, number, key), set()).add(unit)
+                keys[number - 1] = key
+
+    def x_wing_from(self, unit):
+        """
+        Applies the first X-Wing that has unit as one of its two lines
+        """
+        # Rows have collumns as cover units, collumns have rows
+        cover_start = 9 if unit < 9 else 0
+        for number, key in enumerate(self.line_keys[unit], 1):
+            if not key:
+                continue
+            bit = 1 << (number - 1)
+            for other in self.lines_by_key[unit < 9, number, key]:
+                if other == unit:
+                    continue
+                changed = False
+                # The mask's set bits are the cover positions, DIGITS counts them from 1
+                for position in DIGITS[key]:
+                    for index in UNITS[cover_start + position - 1]:
+                        if (self.candidates[index] & bit and index not in UNITS[unit]
+                                and index not in UNITS[other] and self.eliminate(index, bit)):
+                            changed = True
+                if changed:
+                    return True
+        return False
+
+    def xy_wing(self):
+        """
+        A pivot cell XY seeing wings XZ and YZ removes Z from every cell
+        seeing both wings
+
+        A bivalue cell keeps its two candidates until it is filled, so a new
+        XY-Wing needs one of its cells to have become bivalue since the last
+        search. New cells are searched as pivots with every pair of wings, and
+        as a wing of the pivots that are not new themselves.
+        """
+        new = set(self.new_pairs)
+        for cell in sorted(new):
+            mask = self.candidates[cell]
+            if POPCOUNT[mask] == 2:
+                # The cell stays new when a wing is found, there may be more around it
+                if self.xy_wing_at(cell):
+                    return True
+                for pivot in PEERS[cell]:
+                    pivot_mask = self.candidates[pivot]
+                    if (pivot not in new and POPCOUNT[pivot_mask] == 2
+                            and POPCOUNT[pivot_mask & mask] == 1 and self.xy_wing_at(pivot, cell)):
+                        return True
+            self.new_pairs.discard(cell)
+        return False
+
+    def xy_wing_at(self, pivot, wing=None):
+        """
+        Applies the first XY-Wing around pivot, with wing as one of its wings when given
+        """
+        pivot_mask = self.candidates[pivot]
+        wings = [index for index in PEERS[pivot] if POPCOUNT[self.candidates[index]] == 2
+                 and POPCOUNT[self.candidates[index] & pivot_mask] == 1]
+        pairs = combinations(wings, 2) if wing is None else ((wing, other) for other in wings)
+        for first, second in pairs:
+            first_mask = self.candidates[first]
+            second_mask = self.candidates[second]
+            shared = first_mask & second_mask & ~pivot_mask
+            if not shared or (first_mask | second_mask) & pivot_mask != pivot_mask:
+                continue
+            changed = False
+            for index in set(PEERS[first]) & set(PEERS[second]):
+                if self.candidates[index] & shared and index != pivot and self.eliminate(index, shared):
+                    changed = True
+            if changed:
+                return True
+        return False
+
+    def step(self):
+        """
+        Makes one deduction using the cheapest technique that works
+
+        Returns
+        -------
+        technique : String or None
+          Name of the technique used, None if no technique made progress.
+
+        """
+        for technique in TECHNIQUES:
+            if self.methods[technique]():
+                self.record(technique)
+                return technique
+        return None
+
+    def grade(self):
+        """
+        Applies techniques until the puzzle is solved or no technique works
+
+        Returns
+        -------
+        grade : Grade
+          Rating of the hardest technique used plus step counts.
+
+        """
+        hardest = None
+        solved = True
+        while 0 in self.cells:
+            technique = self.step()
+            if technique is None:
+                solved = False
+                break
+            if hardest is None or TECHNIQUES[technique] > TECHNIQUES[hardest]:
+                hardest = technique
+        if not solved:
+            rating = UNSOLVED_RATING
+        else:
+            rating = TECHNIQUES[hardest] if hardest else 0.0
+        return Grade(solved, rating, hardest, self.steps, self.uses)
+
+
+def grade(grid):
+    """
+    Grades a puzzle by the techniques needed to solve it
+
+    Parameters
+    ----------
+    grid : Sequence of 81 ints
+      Cell values in row order, 0 for an empty cell.
+
+    Returns
+    -------
+    grade : Grade
+      Rating, hardest technique and number of steps.
+
+    """
+    return Sudoku_Grader(grid).grade()
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 10:31:54 2026
+
+Next step hints for the board the player is filling in
+
+The engine keeps a Sudoku_Grader for the live board, so pencil mark candidates
+are updated one edit at a time, and a hint is a single grader step rather than
+a new solve. Candidates removed by earlier hints stay removed. Emptying or
+changing a filled cell can't be undone incrementally, so the grader is then
+rebuilt from the board the next time it is needed.
+
+@author: Jack Rawlinson
+"""
+
+from Sudoku_Grader import CELL_UNITS, UNITS, Contradiction, Sudoku_Grader
+from Sudoku_Masks import DIGITS
+
+# What each elimination technique relies on, for explanations
+REASONS = {
+    "Pointing": "inside a box a number is confined to one row or column, "
+                "so it can't go anywhere else in that row or column",
+    "Claiming": "inside a row or column a number is confined to one box, "
+                "so it can't go anywhere else in that box",
+    "Naked pair": "two cells of a unit can only hold the same two numbers, "
+                  "so no other cell of the unit can hold them",
+    "X-Wing": "in two rows (or columns) a number fits the same two columns (or rows), "
+              "so it can't go anywhere else in those columns (or rows)",
+    "Hidden pair": "two numbers can only go in the same two cells of a unit, "
+                   "so those cells can't hold anything else",
+    "Naked triple": "three cells of a unit can only hold three numbers between them, "
+                    "so no other cell of the unit can hold them",
+    "XY-Wing": "a cell with two candidates sees two cells that share one number with it each, "
+               "whichever it holds one of them is the number they have in common, so cells "
+               "seeing both can't hold that number",
+}
+
+
+def cell_name(index):
+    """
+    Player facing name of a cell, e.g. r1c1 for the top left cell
+    """
+    return f'r{index // 9 + 1}c{index % 9 + 1}'
+
+
+def unit_name(unit):
+    """
+    Player facing name of a unit numbered as in Sudoku_Grader.UNITS
+    """
+    return ("row", "column", "box")[unit // 9] + f' {unit % 9 + 1}'
+
+
+class Hint:
+    """
+    One deduction the player can make next
+    """
+
+    def __init__(self, technique, explanation, index=None, number=None, eliminations=None):
+        """
+        Parameters
+        ----------
+        technique : String or None
+          Technique name from Sudoku_Grader.TECHNIQUES, "Mistake" for a wrong
+          number on the board, None when no technique applies.
+        explanation : String
+          Sentence describing the deduction.
+        index : Int, optional
+          Cell the hint is about.
+        number : Int, optional
+          Number that goes in that cell.
+        eliminations : Dict, optional
+          Cell index -> mask of candidates the hint removes.
+
+        """
+        self.technique = technique
+        self.explanation = explanation
+        self.index = index
+        self.number = number
+        self.eliminations = eliminations or {}
+
+    @property
+    def cells(self):
+        """
+        Cells to point out on the board
+        """
+        return ({self.index} if self.index is not None else set()) | set(self.eliminations)
+
+    def __repr__(self):
+        return f'Hint({self.technique!r}, {self.explanation!r})'
+
+
+class Hint_Engine:
+    """
+    Pencil mark candidates of the live board and the next logical step
+    """
+
+    def __init__(self, puzzle=bytes(81), solution=None):
+        """
+        Parameters
+        ----------
+        puzzle : Sequence of 81 ints, optional
+          Given clues in row order, 0 for an empty cell.
+        solution : Sequence of 81 ints, optional
+          Used to point out wrong numbers before giving a hint.
+
+        """
+        self.reset(puzzle, solution)
+
+    def reset(self, puzzle, solution=None):
+        """
+        Starts over on a new puzzle
+        """
+        self.cells = bytearray(puzzle)
+        self.solution = bytes(solution) if solution is not None else None
+        # Placements deduced by hints the player hasn't made yet, cell -> Hint
+        self.deduced = {}
+        self.grader = None
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Builds a fresh grader from the board, None if the board has a contradiction
+        """
+        self.deduced = {}
+        try:
+            self.grader = Sudoku_Grader(self.cells)
+        except Contradiction:
+            self.grader = None
+        self.stale = False
+
+    def set(self, index, number):
+        """
+        Follows one edit of the board
+
+        Parameters
+        ----------
+        index : Int
+          Cell index in row order.
+        number : Int
+          New value 1-9, or 0 to empty the cell.
+
+        Returns
+        -------
+        None.
+
+        """
+        old = self.cells[index]
+        if old == number:
+            return
+        self.cells[index] = number
+        self.deduced.pop(index, None)
+        grader = self.grader
+        if self.stale or grader is None:
+            self.stale = True
+        elif old or not number or grader.cells[index] not in (0, number):
+            # Candidates can't be given back, so start again when needed
+            self.stale = True
+        elif not grader.cells[index]:
+            if not grader.candidates[index] >> (number - 1) & 1:
+                self.stale = True
+            else:
+                try:
+                    grader.place(index, number)
+                except Contradiction:
+                    self.stale = True
+
+    def pencil_marks(self):
+        """
+        Candidates of every empty cell of the board
+
+        Returns
+        -------
+        marks : List of 81 ints
+          Candidate mask of each cell, 0 for filled cells and when the board
+          has a contradiction.
+
+        """
+        if self.stale:
+            self.rebuild()
+        if self.grader is None:
+            return [0] * 81
+        marks = []
+        for index, number in enumerate(self.cells):
+            if number:
+                marks.append(0)
+            elif self.grader.cells[index]:
+                # Placed by a hint but not yet by the player
+                marks.append(1 << (self.grader.cells[index] - 1))
+            else:
+                marks.append(self.grader.candidates[index])
+        return marks
+
+    def hint(self):
+        """
+        Next deduction for the board as it is
+
+        Wrong numbers are pointed out first when the solution is known. A
+        placement already found by an earlier hint is repeated until the
+        player makes it, otherwise the grader takes one step with the
+        cheapest technique that works.
+
+        Returns
+        -------
+        hint : Hint
+
+        """
+        if self.solution is not None:
+            for index, number in enumerate(self.cells):
+                if number and number != self.solution[index]:
+                    return Hint("Mistake", f'{cell_name(index)} should not be {number}', index)
+        if self.stale:
+            self.rebuild()
+        if self.grader is None:
+            return Hint("Mistake", "Some numbers on the board clash with each other")
+        if self.deduced:
+            return next(iter(self.deduced.values()))
+        if 0 not in self.cells:
+            return Hint(None, "The board is complete")
+
+        grader = self.grader
+        before_cells = bytes(grader.cells)
+        before = grader.candidates[:]
+        try:
+            technique = grader.step()
+        except Contradiction:
+            self.grader = None
+            return Hint("Mistake", "One of the numbers on the board is wrong")
+        if technique is None:
+            return Hint(None, "None of the known techniques help here, try a guess")
+
+        placed = [index for index in range(81) if grader.cells[index] != before_cells[index]]
+        if placed:
+            index = placed[0]
+            number = grader.cells[index]
+            hint = Hint(technique, self.placement_explanation(technique, index, number, before),
+                        index, number)
+            self.deduced[index] = hint
+            return hint
+        eliminations = {index: before[index] & ~grader.candidates[index] for index in range(81)
+                        if before[index] != grader.candidates[index]}
+        # Cells grouped by the candidates they lose, e.g. "3 from r4c8, r6c8"
+        groups = {}
+        for index, mask in eliminations.items():
+            groups.setdefault(mask, []).append(cell_name(index))
+        removed = "; ".join(f'{"/".join(map(str, DIGITS[mask]))} from {", ".join(cells)}'
+                            for mask, cells in groups.items())
+        return Hint(technique, f'{technique}: {REASONS[technique]}. Remove {removed}',
+                    eliminations=eliminations)
+
+    @staticmethod
+    def placement_explanation(technique, index, number, candidates):
+        """
+        Sentence explaining a single, from the candidates before it was placed
+        """
+        if technique == "Hidden single":
+            bit = 1 << (number - 1)
+            for unit in CELL_UNITS[index]:
+                if sum(1 for cell in UNITS[unit] if candidates[cell] & bit) == 1:
+                    return (f'Hidden single: {cell_name(index)} is the only place left '
+                            f'for {number} in {unit_name(unit)}')
+        return (f'{technique}: {cell_name(index)} can only be {number}, every other number is '
+                f'already in its row, column or box or ruled out')
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:22:09 2026
+
+Live model of the board the player is filling in
+
+Every edit updates per unit digit counts, the set of empty cells, the cells that
+differ from the solution and the cells clashing with a peer, so checking the
+board never has to look at all 81 cells.
+
+@author: Jack Rawlinson
+"""
+
+from Sudoku_Masks import BOX_OF, COL_OF, PEERS, ROW_OF
+
+
+class Live_Board:
+    """
+    Cell values with running counts kept up to date one edit at a time
+    """
+
+    def __init__(self, solution=bytes(81)):
+        """
+        Parameters
+        ----------
+        solution : bytes, optional
+          81 cell values the board is checked against.
+
+        """
+        self.solution = bytes(solution)
+        self.cells = bytearray(81)
+        # Unit -> digit -> number of cells holding it, index 0 counts nothing
+        self.rows = [[0] * 10 for _ in range(9)]
+        self.cols = [[0] * 10 for _ in range(9)]
+        self.boxes = [[0] * 10 for _ in range(9)]
+        self.empty = set(range(81))
+        # Filled cells whose value is not the solution's
+        self.wrong = set()
+        # Filled cells sharing their value with a peer
+        self.conflicts = set()
+
+    @property
+    def filled(self):
+        """
+        Number of filled cells
+        """
+        return 81 - len(self.empty)
+
+    @property
+    def solved(self):
+        """
+        True once every cell holds the solution's value
+        """
+        return not self.empty and not self.wrong
+
+    def set_solution(self, solution):
+        """
+        Checks the board against a new solution, e.g. for a new puzzle
+        """
+        self.solution = bytes(solution)
+        self.wrong = {index for index, number in enumerate(self.cells)
+                      if number and number != self.solution[index]}
+
+    def clashes(self, index):
+        """
+        True if the value of a filled cell appears twice in one of its units
+        """
+        number = self.cells[index]
+        return number != 0 and (self.rows[ROW_OF[index]][number] > 1
+                                or self.cols[COL_OF[index]][number] > 1
+                                or self.boxes[BOX_OF[index]][number] > 1)
+
+    def set(self, index, number):
+        """
+        Changes the value of one cell
+
+        Parameters
+        ----------
+        index : Int
+          Cell index in row order.
+        number : Int
+          New value 1-9, or 0 to empty the cell.
+
+        Returns
+        -------
+        changed : Set of ints
+          Cells that started or stopped clashing with a peer.
+
+        """
+        old = self.cells[index]
+        if old == number:
+            return set()
+        row, col, box = self.rows[ROW_OF[index]], self.cols[COL_OF[index]], self.boxes[BOX_OF[index]]
+        row[old] -= 1
+        col[old] -= 1
+        box[old] -= 1
+        row[number] += 1
+        col[number] += 1
+        box[number] += 1
+        self.cells[index] = number
+
+        if number:
+            self.empty.discard(index)
+        else:
+            self.empty.add(index)
+        if number and number != self.solution[index]:
+            self.wrong.add(index)
+        else:
+            self.wrong.discard(index)
+
+        # Only this cell and peers holding the old or new value can change state
+        changed = set()
+        for cell in (index,) + PEERS[index]:
+            if cell != index and self.cells[cell] not in (old, number):
+                continue
+            clashes = self.clashes(cell)
+            if clashes and cell not in self.conflicts:
+                self.conflicts.add(cell)
+                changed.add(cell)
+            elif not clashes and cell in self.conflicts:
+                self.conflicts.discard(cell)
+                changed.add(cell)
+        return changed
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:02:37 2026
+
+Compact candidate store using one 9-bit mask per row, collumn and box
+
+Bit x-1 of a mask is set when the number x is already used in that unit, so the
+candidates of a cell are the bits missing from its row, collumn and box masks.
+
+@author: Jack Rawlinson
+"""
+
+# Mask with a bit set for every number 1-9
+FULL_MASK = 0x1FF
+
+# Row, collumn and box of every cell index (cells are numbered in row order)
+ROW_OF = tuple(index // 9 for index in range(81))
+COL_OF = tuple(index % 9 for index in range(81))
+BOX_OF = tuple((index // 27) * 3 + (index % 9) // 3 for index in range(81))
+
+# The 20 cells sharing a row, collumn or box with every cell
+PEERS = tuple(tuple(other for other in range(81) if other != index and (
+    ROW_OF[other] == ROW_OF[index] or COL_OF[other] == COL_OF[index]
+    or BOX_OF[other] == BOX_OF[index])) for index in range(81))
+
+# Number of set bits and list of numbers held in every possible mask
+POPCOUNT = tuple(bin(mask).count("1") for mask in range(FULL_MASK + 1))
+DIGITS = tuple(tuple(number + 1 for number in range(9) if mask >> number & 1)
+               for mask in range(FULL_MASK + 1))
+
+
+class Candidate_Masks:
+    """
+    Cell values plus used-number masks for every row, collumn and box
+    """
+
+    __slots__ = ("cells", "rows", "cols", "boxes")
+
+    def __init__(self):
+        # Value of each cell, 0 when empty
+        self.cells = bytearray(81)
+        # Numbers already used in each unit
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+
+    def candidates(self, index):
+        """
+        Mask of the numbers that can still be placed in a cell
+
+        Parameters
+        ----------
+        index : Int
+          Cell index in row order.
+
+        Returns
+        -------
+        mask : Int
+          Bit x-1 is set if the number x is a valid choice for the cell.
+
+        """
+        return FULL_MASK & ~(self.rows[ROW_OF[index]] | self.cols[COL_OF[index]]
+                             | self.boxes[BOX_OF[index]])
+
+    def place(self, index, number):
+        """
+        Puts a number in an empty cell and removes it from the cell's units
+
+        Parameters
+        ----------
+        index : Int
+          Cell index in row order.
+        number : Int
+          Value between 1 and 9.
+
+        Returns
+        -------
+        None.
+
+        """
+        bit = 1 << (number - 1)
+        self.cells[index] = number
+        self.rows[ROW_OF[index]] |= bit
+        self.cols[COL_OF[index]] |= bit
+        self.boxes[BOX_OF[index]] |= bit
+
+    def remove(self, index):
+        """
+        Empties a cell and makes its number available to the cell's units again
+
+        Parameters
+        ----------
+        index : Int
+          Cell index in row order.
+
+        Returns
+        -------
+        None.
+
+        """
+        bit = ~(1 << (self.cells[index] - 1))
+        self.cells[index] = 0
+        self.rows[ROW_OF[index]] &= bit
+        self.cols[COL_OF[index]] &= bit
+        self.boxes[BOX_OF[index]] &= bit
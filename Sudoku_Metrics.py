@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:15:48 2026
+
+Counters and phase timers for generation, exported through pluggable hooks
+
+Recording a count or a phase time only updates a dictionary in memory. Hooks
+are handed a snapshot when emit() is called (or every emit_interval seconds
+from maybe_emit()), so any export I/O stays out of the hot path, e.g.
+
+    METRICS.add_hook(lambda snapshot: statsd_client.send(snapshot))
+
+@author: Jack Rawlinson
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class Metrics:
+    """
+    Thread safe registry of counters and phase timers
+    """
+
+    def __init__(self, emit_interval=None):
+        """
+        Parameters
+        ----------
+        emit_interval : Float, optional
+          Seconds between automatic emits from maybe_emit, never when None.
+
+        """
+        self.lock = threading.Lock()
+        self.counters = {}
+        # Phase name -> [number of runs, total seconds, longest run in seconds]
+        self.timers = {}
+        self.hooks = []
+        self.emit_interval = emit_interval
+        self.last_emit = time.monotonic()
+
+    def count(self, name, amount=1):
+        """
+        Adds amount to a counter
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, name, seconds):
+        """
+        Records one run of a phase
+        """
+        with self.lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                if seconds > timer[2]:
+                    timer[2] = seconds
+
+    @contextmanager
+    def timer(self, name):
+        """
+        Times the body of a with statement as one run of phase name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def snapshot(self, reset=False):
+        """
+        Copy of every counter and timer
+
+        Parameters
+        ----------
+        reset : Bool, optional
+          Clear the counters and timers after copying them.
+
+        Returns
+        -------
+        snapshot : Dict
+          {"counters": {name: value},
+           "timers": {name: {"count", "total_s", "max_s"}}}
+
+        """
+        with self.lock:
+            snapshot = {
+                "counters": dict(self.counters),
+                "timers": {name: {"count": count, "total_s": total, "max_s": longest}
+                           for name, (count, total, longest) in self.timers.items()},
+            }
+            if reset:
+                self.counters.clear()
+                self.timers.clear()
+        return snapshot
+
+    def add_hook(self, hook):
+        """
+        Registers a callable that is given every emitted snapshot
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """
+        Unregisters a hook added with add_hook
+        """
+        self.hooks.remove(hook)
+
+    def emit(self, reset=False):
+        """
+        Hands a snapshot to every hook
+
+        A failing hook is logged and never breaks generation.
+
+        Parameters
+        ----------
+        reset : Bool, optional
+          Clear the counters and timers once they are emitted.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.last_emit = time.monotonic()
+        if not self.hooks:
+            return
+        snapshot = self.snapshot(reset)
+        for hook in list(self.hooks):
+            try:
+                hook(snapshot)
+            except Exception:
+                logger.exception("Metrics hook %r failed", hook)
+
+    def maybe_emit(self):
+        """
+        Emits if emit_interval seconds have passed since the last emit
+        """
+        if self.emit_interval is not None and time.monotonic() - self.last_emit >= self.emit_interval:
+            self.emit()
+
+
+def json_lines_hook(path):
+    """
+    Hook appending each snapshot to a file as one line of JSON
+
+    Parameters
+    ----------
+    path : String
+      File to append to.
+
+    Returns
+    -------
+    hook : Callable
+      Pass to Metrics.add_hook.
+
+    """
+    def hook(snapshot):
+        with open(path, "a") as file:
+            file.write(json.dumps(dict(snapshot, time=time.time())) + "\n")
+    return hook
+
+
+# Shared registry used by the engine, pool and GUI
+METRICS = Metrics()
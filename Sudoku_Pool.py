@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:05:44 2026
+
+Pool of ready made puzzles kept topped up by a background thread
+
+@author: Jack Rawlinson
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+from Sudoku_Engine import DIFFICULTIES, Generation_Failed, Sudoku_Puzzle, puzzle_from_seed
+from Sudoku_Metrics import METRICS
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class Puzzle_Pool:
+    """
+    Bounded queue of generated puzzles for every difficulty
+
+    When a difficulty drops below the low watermark the worker thread refills
+    it up to the high watermark, one puzzle at a time so the emptiest
+    difficulty is always served first.
+    """
+
+    def __init__(self, low=2, high=8, path=None, difficulties=DIFFICULTIES):
+        """
+        Parameters
+        ----------
+        low : Int, optional
+          Refill a difficulty once it holds fewer puzzles than this.
+        high : Int, optional
+          Stop refilling a difficulty once it holds this many puzzles.
+        path : String, optional
+          JSON file the pool is loaded from and saved to on close, so puzzles
+          survive restarts. Nothing is saved when not given.
+        difficulties : Sequence of strings, optional
+          Difficulties to keep puzzles for.
+
+        """
+        self.low = low
+        self.high = high
+        self.path = path
+        self.puzzles = {difficulty: deque() for difficulty in difficulties}
+        # Difficulties below the low watermark that are being refilled to high
+        self.refilling = set()
+        self.condition = threading.Condition()
+        self.closed = False
+        # Seeds for new puzzles, so every puzzle in the pool has an ID
+        self.rng = np.random.default_rng()
+        self.rng_lock = threading.Lock()
+        self.load()
+        self.thread = threading.Thread(target=self.refill, name="Puzzle_Pool", daemon=True)
+
+    def start(self):
+        """
+        Starts the background refill thread
+        """
+        self.thread.start()
+
+    def __len__(self):
+        with self.condition:
+            return sum(len(puzzles) for puzzles in self.puzzles.values())
+
+    def pop(self, difficulty, cancel=None):
+        """
+        Takes a ready puzzle of the given difficulty
+
+        Parameters
+        ----------
+        difficulty : String
+          One of the pool's difficulties.
+        cancel : threading.Event, optional
+          Stops generating on the spot when set, see Sudoku_Engine.
+
+        Returns
+        -------
+        puzzle : Sudoku_Puzzle
+          A puzzle from the pool, or one generated on the spot if that
+          difficulty has run dry.
+
+        """
+        with self.condition:
+            puzzles = self.puzzles[difficulty]
+            if puzzles:
+                puzzle = puzzles.popleft()
+                if len(puzzles) < self.low:
+                    self.condition.notify()
+                METRICS.count("pool_hits")
+                return puzzle
+        # Pool is empty, generate here rather than waiting on the worker
+        METRICS.count("pool_misses")
+        logger.info("%s pool empty, generating a puzzle on demand", difficulty)
+        return puzzle_from_seed(self.new_seed(), difficulty, cancel)
+
+    def new_seed(self):
+        """
+        Random seed for the next puzzle, safe to call from any thread
+        """
+        with self.rng_lock:
+            return int(self.rng.integers(2**63))
+
+    def next_difficulty(self):
+        """
+        Difficulty the worker should generate next, None when every pool is full
+
+        Must be called with self.condition held.
+        """
+        for difficulty, puzzles in self.puzzles.items():
+            if len(puzzles) < self.low:
+                self.refilling.add(difficulty)
+            elif len(puzzles) >= self.high:
+                self.refilling.discard(difficulty)
+        if not self.refilling:
+            return None
+        return min(self.refilling, key=lambda difficulty: len(self.puzzles[difficulty]))
+
+    def refill(self):
+        """
+        Worker thread loop, generates puzzles whenever a pool needs them
+        """
+        while True:
+            with self.condition:
+                difficulty = self.next_difficulty()
+                while difficulty is None and not self.closed:
+                    self.condition.wait()
+                    difficulty = self.next_difficulty()
+                if self.closed:
+                    return
+            # Generate without holding the lock so pop never waits on it
+            try:
+                puzzle = puzzle_from_seed(self.new_seed(), difficulty)
+            except Generation_Failed as error:
+                # Another seed is drawn on the next pass
+                logger.warning("%s", error)
+                continue
+            with self.condition:
+                self.puzzles[difficulty].append(puzzle)
+
+    def close(self, timeout=None):
+        """
+        Stops the worker thread and saves the pool if it has a path
+
+        Parameters
+        ----------
+        timeout : Float, optional
+          Seconds to wait for a puzzle being generated to finish.
+
+        Returns
+        -------
+        None.
+
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread.is_alive():
+            self.thread.join(timeout)
+        self.save()
+
+    def load(self):
+        """
+        Fills the pool from self.path, if the file exists
+        """
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            # A damaged pool file only costs some regeneration
+            logger.warning("Ignoring unreadable puzzle pool %s", self.path)
+            return
+        for difficulty, puzzles in saved.items():
+            if difficulty in self.puzzles:
+                self.puzzles[difficulty].extend(
+                    Sudoku_Puzzle.from_dict(puzzle) for puzzle in puzzles[:self.high])
+
+    def save(self):
+        """
+        Writes the pool to self.path, if set
+        """
+        if self.path is None:
+            return
+        with self.condition:
+            saved = {difficulty: [puzzle.to_dict() for puzzle in puzzles]
+                     for difficulty, puzzles in self.puzzles.items()}
+        # Write to a temporary file first so a crash never leaves half a pool
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(saved, file)
+        os.replace(temporary, self.path)
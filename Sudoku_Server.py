@@ -0,0 +1,551 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:12:40 2026
+
+Local HTTP/JSON puzzle service built on asyncio
+
+    GET  /generate?difficulty=hard&count=1   ready made puzzles with IDs and solutions
+    POST /solve     {"puzzle": "<81 chars>"} or {"puzzles": [...]}
+    POST /validate  {"puzzle": "<81 chars>"} or {"puzzles": [...]}
+    GET  /health    puzzles waiting in the buffer
+
+Generation and solving run in separate process pools, so the event loop only
+moves bytes and a solve never queues behind a buffer refill. Puzzles are
+generated ahead into a buffer per difficulty, so a request is normally
+answered without generating anything. Solve and validate requests arriving
+within a few milliseconds of each other are sent to the pool as one batch, e.g.
+
+    python -m Sudoku_Engine serve --port 8080
+
+@author: Jack Rawlinson
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from Sudoku_Engine import (DIFFICULTIES, grid_to_line, line_to_grid, parse_difficulty,
+                           puzzle_from_seed)
+from Sudoku_Metrics import METRICS
+from Sudoku_Sized import Search_Budget_Exceeded
+from Sudoku_Solver import Sudoku_Solver
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1 << 20
+# Most puzzles handled by one request
+MAX_PUZZLES = 1000
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+# Search nodes allowed per solved or validated grid, a few seconds at most
+SOLVE_BUDGET = 10**6
+# Pool workers are started with a clean set of file descriptors. A worker forked
+# while a connection is open would hold its socket, and a client closing the
+# connection would never see EOF
+POOL_START_METHOD = ("forkserver" if "forkserver" in multiprocessing.get_all_start_methods()
+                     else "spawn")
+
+
+def generate_puzzles(seeds, difficulty):
+    """
+    Pool worker: the puzzle of every seed, see puzzle_from_seed
+    """
+    return [puzzle_from_seed(seed, difficulty) for seed in seeds]
+
+
+def check_grids(grids, budget=SOLVE_BUDGET):
+    """
+    Pool worker: solves a batch of 9x9 grids
+
+    Parameters
+    ----------
+    grids : List of grids
+      Grids sent by clients.
+    budget : Int, optional
+      Search nodes allowed per grid, so no grid holds a worker for long.
+
+    Returns
+    -------
+    results : List of tuples
+      (valid, solutions, solution) per grid. valid is False when a number is
+      repeated in a unit, solutions is 0, 1 or 2 (meaning two or more), None
+      when the budget ran out, and solution is the first solution found or None.
+
+    """
+    results = []
+    for grid in grids:
+        solver = Sudoku_Solver(grid, budget)
+        try:
+            solutions = solver.count(2)
+        except Search_Budget_Exceeded:
+            solutions = None
+        results.append((solver.valid, solutions, solver.solution))
+    return results
+
+
+def solve_status(solutions):
+    """
+    Status of a grid from its check_grids solution count, as in Sudoku_Bulk
+    """
+    return "unfinished" if solutions is None else ("unsolvable", "solved", "multiple")[solutions]
+
+
+class Request_Batcher:
+    """
+    Collects items submitted close together and runs them as one pool call
+    """
+
+    def __init__(self, function, executor, workers=1, window=0.002, max_batch=256):
+        """
+        Parameters
+        ----------
+        function : Callable
+          Takes a list of items and returns a list of results in the same order.
+        executor : concurrent.futures.Executor
+          Where function runs.
+        workers : Int, optional
+          Processes of the executor, a batch is split into this many calls.
+        window : Float, optional
+          Seconds to wait for more items after the first one of a batch.
+        max_batch : Int, optional
+          A batch this large is sent straight away.
+
+        """
+        self.function = function
+        self.executor = executor
+        self.workers = workers
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []
+        self.timer = None
+
+    async def submit(self, item):
+        """
+        Result of function for one item, once its batch has run
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((item, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return await future
+
+    def flush(self):
+        """
+        Sends the pending items to the executor
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        METRICS.count("server_batches")
+        # One call per worker so a batch doesn't wait on a single process
+        size = -(-len(batch) // self.workers)
+        for start in range(0, len(batch), size):
+            part = batch[start:start + size]
+            task = asyncio.get_running_loop().run_in_executor(
+                self.executor, self.function, [item for item, _ in part])
+            task.add_done_callback(lambda task, part=part: self.deliver(task, part))
+
+    @staticmethod
+    def deliver(task, batch):
+        """
+        Hands every request of a finished batch its result (or the batch's error)
+        """
+        error = task.exception()
+        results = [None] * len(batch) if error else task.result()
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # The client went away
+                continue
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+class Puzzle_Buffer:
+    """
+    Puzzles generated ahead for every difficulty, refilled in pool sized batches
+    """
+
+    def __init__(self, executor, workers, size=16, batch_size=4, difficulties=DIFFICULTIES):
+        """
+        Parameters
+        ----------
+        executor : concurrent.futures.Executor
+          Where puzzles are generated.
+        workers : Int
+          Processes of the executor, batches are split between them.
+        size : Int, optional
+          Puzzles to keep ready per difficulty.
+        batch_size : Int, optional
+          Puzzles generated by a worker per call.
+        difficulties : Sequence of strings, optional
+          Difficulties to keep puzzles for.
+
+        """
+        self.executor = executor
+        self.workers = workers
+        self.size = size
+        self.batch_size = batch_size
+        self.ready = {difficulty: deque() for difficulty in difficulties}
+        # Requests waiting because the buffer ran dry, served first
+        self.waiting = {difficulty: deque() for difficulty in difficulties}
+        self.refilling = set()
+        self.tasks = set()
+        self.rng = np.random.default_rng()
+
+    def start(self):
+        """
+        Starts filling every difficulty
+        """
+        for difficulty in self.ready:
+            self.refill(difficulty)
+
+    async def get(self, difficulty):
+        """
+        Takes a puzzle, waiting for the next generated one if none is ready
+        """
+        if self.ready[difficulty]:
+            METRICS.count("server_buffer_hits")
+            puzzle = self.ready[difficulty].popleft()
+            self.refill(difficulty)
+            return puzzle
+        METRICS.count("server_buffer_misses")
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[difficulty].append(future)
+        self.refill(difficulty)
+        return await future
+
+    def needed(self, difficulty):
+        """
+        Puzzles to generate to serve every waiting request and fill the buffer
+        """
+        return len(self.waiting[difficulty]) + self.size - len(self.ready[difficulty])
+
+    def refill(self, difficulty):
+        """
+        Starts a refill task for a difficulty unless one is running or it is full
+        """
+        if difficulty in self.refilling or self.needed(difficulty) <= 0:
+            return
+        self.refilling.add(difficulty)
+        task = asyncio.get_running_loop().create_task(self.produce(difficulty))
+        # Keep a reference so the task isn't garbage collected while running
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def produce(self, difficulty):
+        """
+        Generates puzzles in the pool until the difficulty needs no more
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            while self.needed(difficulty) > 0:
+                count = min(self.needed(difficulty), self.workers * self.batch_size)
+                seeds = self.rng.integers(2**63, size=count).tolist()
+                batches = await asyncio.gather(*(
+                    loop.run_in_executor(self.executor, generate_puzzles,
+                                         seeds[start:start + self.batch_size], difficulty)
+                    for start in range(0, count, self.batch_size)))
+                for puzzles in batches:
+                    for puzzle in puzzles:
+                        self.put(difficulty, puzzle)
+        except Exception as error:
+            logger.exception("Generating %s puzzles failed", difficulty)
+            while self.waiting[difficulty]:
+                future = self.waiting[difficulty].popleft()
+                if not future.done():
+                    future.set_exception(error)
+        finally:
+            self.refilling.discard(difficulty)
+
+    def put(self, difficulty, puzzle):
+        """
+        Gives a new puzzle to the longest waiting request, or to the buffer
+        """
+        waiting = self.waiting[difficulty]
+        while waiting:
+            future = waiting.popleft()
+            if not future.done():
+                future.set_result(puzzle)
+                return
+        self.ready[difficulty].append(puzzle)
+
+
+class Request_Error(Exception):
+    """
+    A request that can't be served, answered with status and message
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Sudoku_Server:
+    """
+    Minimal HTTP/1.1 server (keep-alive, Content-Length bodies) for the puzzle service
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, workers=None, buffer_size=16,
+                 batch_window=0.002):
+        """
+        Parameters
+        ----------
+        host, port : optional
+          Address to listen on.
+        workers : Int, optional
+          Processes for generating, and as many for solving, one per core when not given.
+        buffer_size : Int, optional
+          Puzzles kept ready per difficulty.
+        batch_window : Float, optional
+          Seconds solve and validate requests are collected for before running.
+
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        context = multiprocessing.get_context(POOL_START_METHOD)
+        self.generators = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        self.solvers = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        self.buffer = Puzzle_Buffer(self.generators, self.workers, buffer_size)
+        self.checker = Request_Batcher(check_grids, self.solvers, self.workers, batch_window)
+        self.server = None
+
+    async def start(self):
+        """
+        Starts the solver processes, then listens and fills the puzzle buffer
+        """
+        # Workers start on demand, so the first solve would otherwise wait for one
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.solvers, check_grids, [])
+                               for _ in range(self.workers)))
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        # Port 0 picks a free port, report the real one
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.buffer.start()
+        logger.info("Serving puzzles on http://%s:%d with %d workers", self.host, self.port,
+                    self.workers)
+
+    async def serve_forever(self):
+        """
+        Starts the server and runs until cancelled
+        """
+        await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Stops listening and shuts down the worker processes
+        """
+        if self.server is not None:
+            self.server.close()
+        self.generators.shutdown(wait=False, cancel_futures=True)
+        self.solvers.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves requests on one connection until the client closes it
+        """
+        try:
+            while True:
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                try:
+                    status, payload = 200, await self.route(method, target, body)
+                except Request_Error as error:
+                    status, payload = error.status, {"error": str(error)}
+                except Exception:
+                    logger.exception("Request %s %s failed", method, target)
+                    status, payload = 500, {"error": "Internal error"}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self.write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Request_Error as error:
+            # The request could not even be read, answer and drop the connection
+            self.write_response(writer, error.status, {"error": str(error)}, False)
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def read_request(reader):
+        """
+        Reads one request
+
+        Returns
+        -------
+        request : Tuple or None
+          (method, target, headers, body), None when the client closed the connection.
+
+        """
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split()
+        except ValueError:
+            raise Request_Error(400, "Malformed request line") from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise Request_Error(400, "Invalid Content-Length") from None
+        if length > MAX_BODY:
+            raise Request_Error(413, f'Request bodies are limited to {MAX_BODY} bytes')
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def write_response(writer, status, payload, keep_alive):
+        """
+        Writes a JSON response
+        """
+        body = json.dumps(payload).encode()
+        writer.write(f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+                     f'Content-Type: application/json\r\n'
+                     f'Content-Length: {len(body)}\r\n'
+                     f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode()
+                     + body)
+
+    async def route(self, method, target, body):
+        """
+        Dispatches a request to its endpoint
+
+        Returns
+        -------
+        payload : Dict
+          JSON response body.
+
+        """
+        url = urlsplit(target)
+        routes = {"/generate": ("GET", self.generate), "/solve": ("POST", self.solve),
+                  "/validate": ("POST", self.validate), "/health": ("GET", self.health)}
+        if url.path not in routes:
+            raise Request_Error(404, f'Unknown endpoint {url.path}')
+        allowed, endpoint = routes[url.path]
+        if method != allowed:
+            raise Request_Error(405, f'{url.path} only accepts {allowed}')
+        if allowed == "GET":
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            return await endpoint(query)
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise Request_Error(400, "Body is not valid JSON") from None
+        if not isinstance(request, dict):
+            raise Request_Error(400, "Body must be a JSON object")
+        return await endpoint(request)
+
+    async def generate(self, query):
+        """
+        GET /generate?difficulty=<easy|medium|hard>&count=<n>
+        """
+        try:
+            difficulty = parse_difficulty(query.get("difficulty", "Hard"))
+            count = int(query.get("count", 1))
+        except (argparse.ArgumentTypeError, ValueError) as error:
+            raise Request_Error(400, str(error)) from None
+        if not 1 <= count <= MAX_PUZZLES:
+            raise Request_Error(400, f'count must be 1-{MAX_PUZZLES}')
+        puzzles = await asyncio.gather(*(self.buffer.get(difficulty) for _ in range(count)))
+        return {"puzzles": [{
+            "id": puzzle.id,
+            "difficulty": difficulty,
+            "puzzle": puzzle.line(difficulty),
+            "solution": grid_to_line(puzzle.solution),
+            "rating": puzzle.grades[difficulty].rating if difficulty in puzzle.grades else None,
+        } for puzzle in puzzles]}
+
+    async def check(self, request):
+        """
+        Runs the puzzles of a solve or validate request through the batcher
+
+        Returns
+        -------
+        results : List of tuples
+          See check_grids, one per puzzle.
+        single : Bool
+          True if the request held one "puzzle" rather than a "puzzles" list.
+
+        """
+        single = "puzzle" in request
+        lines = [request["puzzle"]] if single else request.get("puzzles")
+        if not isinstance(lines, list) or not lines or len(lines) > MAX_PUZZLES:
+            raise Request_Error(400, f'Send "puzzle" or a list of 1-{MAX_PUZZLES} "puzzles"')
+        grids = []
+        for line in lines:
+            try:
+                grid = line_to_grid(line) if isinstance(line, str) else None
+            except ValueError as error:
+                raise Request_Error(400, str(error)) from None
+            if grid is None or len(grid) != 81:
+                raise Request_Error(400, "Puzzles must be 81 character lines")
+            grids.append(grid)
+        results = await asyncio.gather(*(self.checker.submit(grid) for grid in grids))
+        return results, single
+
+    async def solve(self, request):
+        """
+        POST /solve, the solution of each puzzle (null if it has none)
+
+        status is "solved", "multiple", "unsolvable" or "unfinished" when the
+        search budget ran out before the puzzle was settled.
+        """
+        results, single = await self.check(request)
+        answers = [{"solution": grid_to_line(solution) if solution else None,
+                    "unique": solutions == 1, "status": solve_status(solutions)}
+                   for _, solutions, solution in results]
+        return answers[0] if single else {"results": answers}
+
+    async def validate(self, request):
+        """
+        POST /validate, whether each puzzle is consistent, solvable and unique
+
+        solvable and unique are null when the search budget ran out, status is
+        as for /solve.
+        """
+        results, single = await self.check(request)
+        answers = [{"valid": valid,
+                    "solvable": None if solutions is None else solutions > 0,
+                    "unique": None if solutions is None else solutions == 1,
+                    "status": solve_status(solutions)}
+                   for valid, solutions, _ in results]
+        return answers[0] if single else {"results": answers}
+
+    async def health(self, query):
+        """
+        GET /health, puzzles ready per difficulty
+        """
+        return {"ready": {difficulty: len(puzzles)
+                          for difficulty, puzzles in self.buffer.ready.items()}}
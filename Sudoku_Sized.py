@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:08:51 2026
+
+Boards of any box size: 4x4 (box 2), 9x9 (box 3), 16x16 (box 4), 25x25 (box 5)
+
+A board with box size b has N = b*b rows, collumns and boxes and N*N cells.
+Every cell keeps an N-bit candidate mask (a single bit once its value is known)
+and constraint propagation places naked and hidden singles. Only the rows,
+collumns and boxes touched by a change are rescanned for hidden singles, which
+keeps propagation cheap on the 625 cells of a 25x25 board.
+
+@author: Jack Rawlinson
+"""
+
+from functools import lru_cache
+
+
+class Board_Geometry:
+    """
+    Cell, unit and peer tables for one box size
+    """
+
+    def __init__(self, box):
+        """
+        Parameters
+        ----------
+        box : Int
+          Width of a box, the board is box**2 cells wide.
+
+        """
+        size = box * box
+        self.box = box
+        self.size = size
+        self.cells = size * size
+        # Mask with a bit set for every number 1-N
+        self.full_mask = (1 << size) - 1
+        self.row_of = tuple(index // size for index in range(self.cells))
+        self.col_of = tuple(index % size for index in range(self.cells))
+        self.box_of = tuple((index // size // box) * box + (index % size) // box
+                            for index in range(self.cells))
+        # Rows, then collumns, then boxes
+        self.units = tuple(
+            tuple(index for index in range(self.cells) if unit_of[index] == unit)
+            for unit_of in (self.row_of, self.col_of, self.box_of) for unit in range(size))
+        self.cell_units = tuple((self.row_of[index], size + self.col_of[index],
+                                 2 * size + self.box_of[index]) for index in range(self.cells))
+        self.peers = tuple(
+            tuple(sorted(set().union(*(self.units[unit] for unit in self.cell_units[index]))
+                         - {index})) for index in range(self.cells))
+
+
+@lru_cache(maxsize=None)
+def geometry(box):
+    """
+    Shared Board_Geometry of a box size, the tables are only built once
+    """
+    if not 2 <= box <= 5:
+        raise ValueError(f'Box size must be 2-5, not {box}')
+    return Board_Geometry(box)
+
+
+class Search_Budget_Exceeded(Exception):
+    """
+    Raised when a search visits more nodes than it was allowed
+    """
+
+
+def popcount(mask):
+    """
+    Number of candidates in a mask
+    """
+    return bin(mask).count("1")
+
+
+def propagate(geometry, candidates, queue, dirty=None):
+    """
+    Places naked and hidden singles until nothing more follows
+
+    Parameters
+    ----------
+    geometry : Board_Geometry
+      Shape of the board.
+    candidates : List of ints
+      Candidate mask of every cell, updated in place.
+    queue : List of ints
+      Cells that became single valued and still have to be removed from their peers.
+    dirty : Set of ints, optional
+      Units to check for hidden singles, all of them when not given.
+
+    Returns
+    -------
+    Bool
+      False if a cell or a unit ran out of places for a number.
+
+    """
+    peers = geometry.peers
+    units = geometry.units
+    cell_units = geometry.cell_units
+    full_mask = geometry.full_mask
+    dirty = set(range(len(units))) if dirty is None else dirty
+    while True:
+        while queue:
+            index = queue.pop()
+            bit = candidates[index]
+            for peer in peers[index]:
+                mask = candidates[peer]
+                if mask & bit:
+                    mask &= ~bit
+                    if not mask:
+                        return False
+                    candidates[peer] = mask
+                    dirty.update(cell_units[peer])
+                    if not mask & (mask - 1):
+                        queue.append(peer)
+        # Look for hidden singles only once naked singles are exhausted
+        while dirty and not queue:
+            unit = units[dirty.pop()]
+            # Numbers seen at least once and at least twice in the unit
+            once = twice = 0
+            for index in unit:
+                mask = candidates[index]
+                twice |= once & mask
+                once |= mask
+            if once != full_mask:
+                return False
+            hidden = once & ~twice
+            if hidden:
+                for index in unit:
+                    mask = candidates[index]
+                    if mask & hidden and mask & (mask - 1):
+                        mask &= hidden
+                        # Two numbers that can only go in this cell
+                        if mask & (mask - 1):
+                            return False
+                        candidates[index] = mask
+                        queue.append(index)
+        if not queue:
+            return True
+
+
+def search(geometry, candidates, limit, budget, solutions=None):
+    """
+    Counts solutions of propagated candidates, fewest candidates first
+
+    Parameters
+    ----------
+    geometry : Board_Geometry
+      Shape of the board.
+    candidates : List of ints
+      Candidate masks after propagate, not changed.
+    limit : Int
+      Stop once this many solutions are found.
+    budget : List of one int
+      Nodes the search may still visit, shared by the recursion.
+    solutions : List, optional
+      Candidate masks of every solution found are appended to it.
+
+    Returns
+    -------
+    found : Int
+      Number of solutions found, at most limit.
+
+    Raises
+    ------
+    Search_Budget_Exceeded
+      When the budget runs out first.
+
+    """
+    best = -1
+    best_count = geometry.size + 1
+    for index, mask in enumerate(candidates):
+        if mask & (mask - 1):
+            count = popcount(mask)
+            if count < best_count:
+                best = index
+                best_count = count
+                if count == 2:
+                    break
+    if best < 0:
+        if solutions is not None:
+            solutions.append(candidates)
+        return 1
+
+    budget[0] -= 1
+    if budget[0] < 0:
+        raise Search_Budget_Exceeded()
+    found = 0
+    mask = candidates[best]
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        trial = candidates[:]
+        trial[best] = bit
+        if propagate(geometry, trial, [best], set(geometry.cell_units[best])):
+            found += search(geometry, trial, limit - found, budget, solutions)
+            if found >= limit:
+                break
+    return found
+
+
+def grid_candidates(geometry, grid):
+    """
+    Candidate masks of a grid with nothing propagated yet
+
+    Returns
+    -------
+    candidates : List of ints
+      A single bit for filled cells, every number for empty cells.
+    queue : List of ints
+      The filled cells, ready to be passed to propagate.
+
+    """
+    candidates = [1 << (number - 1) if number else geometry.full_mask for number in grid]
+    return candidates, [index for index, number in enumerate(grid) if number]
+
+
+def count_solutions(geometry, grid, limit=2, budget=10**6):
+    """
+    Number of solutions of a grid of any box size, up to limit
+
+    Raises Search_Budget_Exceeded if budget search nodes are not enough.
+    """
+    candidates, queue = grid_candidates(geometry, grid)
+    if not propagate(geometry, candidates, queue):
+        return 0
+    return search(geometry, candidates, limit, [budget])
+
+
+def solvable_by_singles(geometry, grid, naked=True):
+    """
+    True if a grid can be solved by placing singles alone
+
+    Parameters
+    ----------
+    geometry : Board_Geometry
+      Shape of the board.
+    grid : Sequence of ints
+      Cell values in row order, 0 for an empty cell.
+    naked : Bool, optional
+      Also allow naked singles (a cell with one candidate left), otherwise
+      only hidden singles (a number with one place left in a unit).
+
+    Returns
+    -------
+    Bool
+
+    """
+    size = geometry.size
+    rows = [0] * size
+    cols = [0] * size
+    boxes = [0] * size
+    empty = []
+    for index, number in enumerate(grid):
+        if number:
+            bit = 1 << (number - 1)
+            rows[geometry.row_of[index]] |= bit
+            cols[geometry.col_of[index]] |= bit
+            boxes[geometry.box_of[index]] |= bit
+        else:
+            empty.append(index)
+    empty = set(empty)
+
+    while empty:
+        placed = {}
+        for unit in geometry.units:
+            # Numbers that fit exactly one empty cell of the unit
+            once = twice = 0
+            masks = {}
+            for index in unit:
+                if index in empty:
+                    mask = geometry.full_mask & ~(rows[geometry.row_of[index]]
+                                                  | cols[geometry.col_of[index]]
+                                                  | boxes[geometry.box_of[index]])
+                    masks[index] = mask
+                    if naked and mask and not mask & (mask - 1):
+                        placed[index] = mask
+                    twice |= once & mask
+                    once |= mask
+            hidden = once & ~twice
+            if hidden:
+                for index, mask in masks.items():
+                    if mask & hidden:
+                        placed[index] = mask & hidden & -(mask & hidden)
+        if not placed:
+            return False
+        for index, bit in placed.items():
+            rows[geometry.row_of[index]] |= bit
+            cols[geometry.col_of[index]] |= bit
+            boxes[geometry.box_of[index]] |= bit
+            empty.discard(index)
+    return True
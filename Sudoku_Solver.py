@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:08:51 2026
+
+Fast bitmask sudoku solver and solution counter
+
+Used to check that a puzzle has exactly one solution while removing clues,
+so it stops as soon as the requested number of solutions has been found.
+
+@author: Jack Rawlinson
+"""
+
+from Sudoku_Masks import BOX_OF, COL_OF, FULL_MASK, POPCOUNT, ROW_OF
+from Sudoku_Sized import Search_Budget_Exceeded
+
+
+class Sudoku_Solver:
+    """
+    Depth first search over used-number masks, most constrained cell first
+    """
+
+    def __init__(self, grid, budget=None):
+        """
+        Parameters
+        ----------
+        grid : Sequence of 81 ints
+          Cell values in row order, 0 for an empty cell.
+        budget : Int, optional
+          Search nodes allowed, e.g. for grids from untrusted sources. No
+          limit when not given.
+
+        """
+        self.cells = bytearray(grid)
+        self.budget = budget
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        # Number of search steps taken, for solve statistics
+        self.nodes = 0
+        self.valid = True
+        for index, number in enumerate(self.cells):
+            if number:
+                bit = 1 << (number - 1)
+                row, collumn, box = ROW_OF[index], COL_OF[index], BOX_OF[index]
+                # A number repeated in a unit makes the puzzle unsolvable
+                if (self.rows[row] | self.cols[collumn] | self.boxes[box]) & bit:
+                    self.valid = False
+                self.rows[row] |= bit
+                self.cols[collumn] |= bit
+                self.boxes[box] |= bit
+        self.empty_cells = [index for index in range(81) if not self.cells[index]]
+        self.solution = None
+
+    def count(self, limit=2):
+        """
+        Counts solutions, stopping once limit of them have been found
+
+        Parameters
+        ----------
+        limit : Int, optional
+          Maximum number of solutions to look for.
+
+        Returns
+        -------
+        count : Int
+          Number of solutions found, at most limit. The first solution found
+          is kept in self.solution.
+
+        Raises
+        ------
+        Search_Budget_Exceeded
+          When the search reaches budget nodes first.
+
+        """
+        if not self.valid:
+            return 0
+        return self.search(limit)
+
+    def search(self, limit):
+        """
+        Recursive step of count, fills the most constrained empty cell
+
+        Parameters
+        ----------
+        limit : Int
+          Maximum number of solutions still wanted.
+
+        Returns
+        -------
+        count : Int
+          Number of solutions found below this point, at most limit.
+
+        """
+        self.nodes += 1
+        if self.nodes == self.budget:
+            raise Search_Budget_Exceeded()
+        empty_cells = self.empty_cells
+        if not empty_cells:
+            if self.solution is None:
+                self.solution = bytes(self.cells)
+            return 1
+
+        rows, cols, boxes = self.rows, self.cols, self.boxes
+        # Find the empty cell with the fewest candidates
+        best_position = 0
+        best_count = 10
+        best_mask = 0
+        for position, index in enumerate(empty_cells):
+            mask = FULL_MASK & ~(rows[ROW_OF[index]] | cols[COL_OF[index]] | boxes[BOX_OF[index]])
+            count = POPCOUNT[mask]
+            if count < best_count:
+                best_position = position
+                best_count = count
+                best_mask = mask
+                if count <= 1:
+                    break
+        if best_count == 0:
+            return 0
+
+        # Swap the chosen cell to the end of the list so it can be popped
+        index = empty_cells[best_position]
+        empty_cells[best_position] = empty_cells[-1]
+        empty_cells.pop()
+        row, collumn, box = ROW_OF[index], COL_OF[index], BOX_OF[index]
+
+        found = 0
+        mask = best_mask
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            rows[row] |= bit
+            cols[collumn] |= bit
+            boxes[box] |= bit
+            self.cells[index] = bit.bit_length()
+            found += self.search(limit - found)
+            rows[row] ^= bit
+            cols[collumn] ^= bit
+            boxes[box] ^= bit
+            if found >= limit:
+                break
+        self.cells[index] = 0
+
+        # Put the cell back where it was so the caller's list is unchanged
+        empty_cells.append(index)
+        empty_cells[best_position], empty_cells[-1] = empty_cells[-1], empty_cells[best_position]
+        return found
+
+
+def count_solutions(grid, limit=2):
+    """
+    Counts the solutions of a puzzle, up to limit
+
+    Parameters
+    ----------
+    grid : Sequence of 81 ints
+      Cell values in row order, 0 for an empty cell.
+    limit : Int, optional
+      Stop searching once this many solutions are found. The default of 2 is
+      enough to tell whether the solution is unique.
+
+    Returns
+    -------
+    count : Int
+      Number of solutions, at most limit.
+
+    """
+    return Sudoku_Solver(grid).count(limit)
+
+
+def has_unique_solution(grid):
+    """
+    True if the puzzle has exactly one solution
+    """
+    return count_solutions(grid, 2) == 1
+
+
+def solve(grid):
+    """
+    Solves a puzzle
+
+    Parameters
+    ----------
+    grid : Sequence of 81 ints
+      Cell values in row order, 0 for an empty cell.
+
+    Returns
+    -------
+    solution : bytes or None
+      81 cell values of a solution, None if the puzzle has no solution.
+
+    """
+    solver = Sudoku_Solver(grid)
+    solver.count(1)
+    return solver.solution
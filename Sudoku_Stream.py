@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 13:47:25 2026
+
+Streaming puzzle records in and out of files, a chunk at a time
+
+A record is a dictionary of some of FIELDS. Writers collect records and write
+them every chunk_size records, readers parse one line at a time, so a
+pipeline such as
+
+    python -m Sudoku_Engine generate --stream --format jsonl \
+        | python -m Sudoku_Engine grade --format jsonl \
+        | python -m Sudoku_Engine store puzzles.bank --format jsonl
+
+runs in constant memory however many puzzles pass through it.
+
+    line    comma separated values, e.g. <puzzle>,<solution>,<id>
+    jsonl   one JSON object per line
+    csv     a header row naming the fields, then one row per record
+
+@author: Jack Rawlinson
+"""
+
+import csv
+import io
+import json
+
+from Sudoku_Engine import DIFFICULTIES, Sudoku_Puzzle, grid_to_line, line_to_grid, parse_puzzle_id
+from Sudoku_Grader import Contradiction, Grade, grade
+from Sudoku_Solver import solve
+
+# Every field a record can hold, in output order
+FIELDS = ("puzzle", "solution", "id", "difficulty", "rating", "hardest")
+
+
+def puzzle_record(puzzle, difficulty, fields):
+    """
+    Record of one difficulty of a puzzle
+
+    Parameters
+    ----------
+    puzzle : Sudoku_Puzzle
+      Generated puzzle.
+    difficulty : String
+      Which of the puzzle's grids to describe.
+    fields : Sequence of strings
+      Fields to include, from FIELDS.
+
+    Returns
+    -------
+    record : Dict
+
+    """
+    grade = puzzle.grades.get(difficulty)
+    values = {
+        "puzzle": lambda: puzzle.line(difficulty),
+        "solution": lambda: grid_to_line(puzzle.solution),
+        "id": lambda: puzzle.id,
+        "difficulty": lambda: difficulty,
+        "rating": lambda: grade.rating if grade else None,
+        "hardest": lambda: grade.hardest if grade else None,
+    }
+    return {field: values[field]() for field in fields}
+
+
+class Record_Writer:
+    """
+    Base class of the writers, buffers formatted records and writes them in chunks
+    """
+
+    def __init__(self, file, fields, chunk_size=1000):
+        """
+        Parameters
+        ----------
+        file : Text file
+          Where records are written, left open by close.
+        fields : Sequence of strings
+          Fields written for every record, in order.
+        chunk_size : Int, optional
+          Records held in memory before they are written and flushed.
+
+        """
+        self.file = file
+        self.fields = tuple(fields)
+        self.chunk_size = chunk_size
+        self.buffer = []
+
+    def format(self, record):
+        """
+        Text of one record, including its line ending
+        """
+        raise NotImplementedError
+
+    def write(self, record):
+        """
+        Adds a record, writing the chunk once it is full
+        """
+        self.buffer.append(self.format(record))
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered records
+        """
+        if self.buffer:
+            self.file.write("".join(self.buffer))
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        """
+        Writes what is left, the file itself is not closed
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Line_Writer(Record_Writer):
+    """
+    Comma separated values without a header, the format generate always wrote
+    """
+
+    def format(self, record):
+        return ",".join("" if record.get(field) is None else str(record[field])
+                        for field in self.fields) + "\n"
+
+
+class JSONL_Writer(Record_Writer):
+    """
+    One JSON object per line
+    """
+
+    def format(self, record):
+        return json.dumps({field: record.get(field) for field in self.fields}) + "\n"
+
+
+class CSV_Writer(Record_Writer):
+    """
+    CSV with a header row of field names
+    """
+
+    def __init__(self, file, fields, chunk_size=1000):
+        super().__init__(file, fields, chunk_size)
+        self.buffer.append(self.format(dict(zip(self.fields, self.fields))))
+
+    def format(self, record):
+        text = io.StringIO()
+        csv.writer(text, lineterminator="\n").writerow(
+            ["" if record.get(field) is None else record[field] for field in self.fields])
+        return text.getvalue()
+
+
+WRITERS = {"line": Line_Writer, "jsonl": JSONL_Writer, "csv": CSV_Writer}
+
+
+def read_records(file, format="line"):
+    """
+    Lazily reads records written in one of the WRITERS formats
+
+    Parameters
+    ----------
+    file : Text file
+      Source of the records.
+    format : String, optional
+      "line", "jsonl" or "csv". Lines hold a puzzle, optionally followed by
+      its solution and ID, as written by generate.
+
+    Yields
+    ------
+    record : Dict
+      Fields of the record, at least "puzzle".
+
+    Raises
+    ------
+    ValueError
+      On a record without a puzzle.
+
+    """
+    if format == "csv":
+        records = csv.DictReader(file)
+    elif format == "jsonl":
+        records = (json.loads(line) for line in file if line.strip())
+    else:
+        records = (line_record(line) for line in file if line.strip())
+    for number, record in enumerate(records, 1):
+        if not isinstance(record, dict) or not record.get("puzzle"):
+            raise ValueError(f'Record {number} has no puzzle')
+        # Empty CSV cells are missing values
+        yield {field: value for field, value in record.items() if value not in ("", None)}
+
+
+def line_record(line):
+    """
+    Record of a line written with the line format
+
+    The first value is the puzzle. The others are recognised by their form: a
+    full grid is the solution, then an ID, a difficulty name, a rating and the
+    name of the hardest technique, so lines written by generate and by grade
+    can both be read back.
+    """
+    values = line.strip().split(",")
+    record = {"puzzle": values[0]}
+    for value in values[1:]:
+        if not value:
+            continue
+        if len(value) == len(values[0]) and "." not in value and "0" not in value:
+            record["solution"] = value
+        elif value in DIFFICULTIES:
+            record["difficulty"] = value
+        elif is_puzzle_id(value):
+            record["id"] = value
+        else:
+            try:
+                record["rating"] = float(value)
+            except ValueError:
+                record["hardest"] = value
+    return record
+
+
+def is_puzzle_id(value):
+    """
+    True if a value reads as a puzzle ID
+    """
+    try:
+        parse_puzzle_id(value)
+    except ValueError:
+        return False
+    return True
+
+
+def grade_record(record):
+    """
+    Adds the difficulty, rating and hardest technique of a 9x9 record's puzzle
+
+    Raises ValueError if the puzzle is not a valid 9x9 puzzle line or its
+    clues contradict each other.
+    """
+    grid = line_to_grid(record["puzzle"])
+    if len(grid) != 81:
+        raise ValueError("Only 9x9 puzzles can be graded")
+    try:
+        result = grade(grid)
+    except Contradiction as error:
+        raise ValueError(f'Puzzle {record["puzzle"]} has no solution ({error})') from None
+    record.update(difficulty=result.difficulty, rating=result.rating, hardest=result.hardest)
+    return record
+
+
+def record_puzzle(record):
+    """
+    Sudoku_Puzzle of a 9x9 record, e.g. to store it in a puzzle bank
+
+    The puzzle is solved when the record has no solution and graded when it
+    has no difficulty.
+
+    Returns
+    -------
+    puzzle : Sudoku_Puzzle
+      Puzzle holding the record's grid under its difficulty.
+    difficulty : String
+
+    Raises
+    ------
+    ValueError
+      If the puzzle is not a 9x9 puzzle line or has no solution.
+
+    """
+    grid = line_to_grid(record["puzzle"])
+    if len(grid) != 81:
+        raise ValueError("Only 9x9 puzzles can be stored in a puzzle bank")
+    solution = line_to_grid(record["solution"]) if "solution" in record else solve(grid)
+    if solution is None:
+        raise ValueError(f'Puzzle {record["puzzle"]} has no solution')
+    if "difficulty" not in record or "rating" not in record:
+        grade_record(record)
+    result = Grade(True, float(record["rating"]), record.get("hardest"), 0, {})
+    puzzle = Sudoku_Puzzle(solution, {record["difficulty"]: grid},
+                           {record["difficulty"]: result})
+    puzzle.id = record.get("id")
+    return puzzle, record["difficulty"]
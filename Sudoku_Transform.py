@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:40:17 2026
+
+Validity preserving transforms of completed sudoku grids
+
+Relabelling the digits, shuffling rows within a band, shuffling the bands,
+shuffling columns within a stack, shuffling the stacks and transposing all turn
+a valid grid into another valid grid, about 1.2 trillion grids per base grid.
+Every transform of a batch is a gather with numpy, so deriving grids is far
+cheaper than filling new ones.
+
+@author: Jack Rawlinson
+"""
+
+import numpy as np
+
+
+def random_lines(rng, count):
+    """
+    Random row (or column) orders that keep every band (or stack) together
+
+    Parameters
+    ----------
+    rng : numpy Generator
+      Source of the shuffles.
+    count : Int
+      Number of orders.
+
+    Returns
+    -------
+    lines : 2-D numpy array
+      intp array of shape (count, 9), line i of a new grid is line lines[:, i] of the old one.
+
+    """
+    bands = rng.random((count, 3)).argsort(axis=1)
+    within = rng.random((count, 3, 3)).argsort(axis=2)
+    return (bands[:, :, None] * 3 + within).reshape(count, 9)
+
+
+def random_cell_maps(rng, count):
+    """
+    Random cell permutations made of line shuffles and an optional transpose
+
+    Parameters
+    ----------
+    rng : numpy Generator
+      Source of the shuffles.
+    count : Int
+      Number of permutations.
+
+    Returns
+    -------
+    cell_maps : 2-D numpy array
+      intp array of shape (count, 81), cell i of a new grid is cell cell_maps[:, i] of the old one.
+
+    """
+    rows = random_lines(rng, count)[:, :, None]
+    cols = random_lines(rng, count)[:, None, :]
+    transpose = (rng.random(count) < 0.5)[:, None, None]
+    return np.where(transpose, cols * 9 + rows, rows * 9 + cols).reshape(count, 81)
+
+
+def random_relabels(rng, count):
+    """
+    Random digit relabellings that keep empty cells (0) empty
+
+    Returns
+    -------
+    relabels : 2-D numpy array
+      uint8 array of shape (count, 10), digit d becomes relabels[:, d].
+
+    """
+    relabels = np.zeros((count, 10), dtype=np.uint8)
+    relabels[:, 1:] = rng.random((count, 9)).argsort(axis=1) + 1
+    return relabels
+
+
+def transform_grids(grids, rng, count=None):
+    """
+    Applies an independent random transform to each grid
+
+    Parameters
+    ----------
+    grids : numpy array
+      uint8 array of shape (81,) for one base grid or (n, 81) for n grids.
+    rng : numpy Generator
+      Source of the transforms.
+    count : Int, optional
+      Number of grids to create from a single base grid. With several grids
+      one new grid is made per grid and count must be left out.
+
+    Returns
+    -------
+    transformed : 2-D numpy array
+      uint8 array of shape (count, 81), or (n, 81) for n grids.
+
+    """
+    grids = np.asarray(grids, dtype=np.uint8)
+    if grids.ndim == 1:
+        grids = np.broadcast_to(grids, (1 if count is None else count, 81))
+    elif count is not None and count != len(grids):
+        raise ValueError(f'count {count} does not match {len(grids)} grids')
+    count = len(grids)
+    cells = np.take_along_axis(grids, random_cell_maps(rng, count), axis=1)
+    return np.take_along_axis(random_relabels(rng, count), cells.astype(np.intp), axis=1)
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+Makes the Sudoku modules importable from the repository root, e.g. for
+
+    python -m pytest tests
+
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the puzzles made by Sudoku_Engine
+"""
+
+import numpy as np
+import pytest
+
+from Sudoku_Engine import DIFFICULTIES, Generation_Failed, Sudoku_Engine
+from Sudoku_Solver import solve
+
+
+def check_solutions(puzzles):
+    """
+    Asserts every puzzle's solution solves each of its grids
+    """
+    for puzzle in puzzles:
+        for difficulty in DIFFICULTIES:
+            assert solve(puzzle.grids[difficulty]) == puzzle.solution, difficulty
+
+
+def test_generate_solution():
+    check_solutions([Sudoku_Engine(np.random.default_rng(seed)).generate() for seed in range(3)])
+
+
+def test_generate_batch_solutions():
+    puzzles = Sudoku_Engine(np.random.default_rng(0)).generate_batch(4)
+    check_solutions(puzzles)
+    # Each puzzle keeps the grid it was dug from
+    assert len({puzzle.solution for puzzle in puzzles}) == 4
+
+
+def test_generate_difficulty_not_reached():
+    # The Hard grid of the first grid of seed 1 only needs hidden singles
+    engine = Sudoku_Engine(np.random.default_rng(1))
+    engine.GRADE_ATTEMPTS = 1
+    with pytest.raises(Generation_Failed, match="Hard"):
+        engine.generate("Hard")
+
+
+def test_transformed_solutions():
+    puzzles = Sudoku_Engine(np.random.default_rng(0)).generate_batch(4, grids_per_base=2)
+    check_solutions(puzzles)
+    # Grids derived from one base grid are still different grids
+    assert len({puzzle.solution for puzzle in puzzles}) == 4
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the incremental technique grader
+"""
+
+import numpy as np
+
+from Sudoku_Engine import Sudoku_Engine
+from Sudoku_Format import line_to_grid
+from Sudoku_Grader import POPCOUNT, Sudoku_Grader, grade
+
+# Hard grid of seed 174, needs pointing after an earlier pointing left its box unchanged
+POINTING_TWICE = ".48..6.....3.9.2...17.8..........8..15.....2......3.67....42.51......67....1....8"
+
+
+class Full_Rescan_Grader(Sudoku_Grader):
+    """
+    Grader searching every unit and cell at every step, the reference for the
+    incremental searches
+    """
+
+    def changed_units(self, technique, units=range(27)):
+        yield from units
+
+    def xy_wing(self):
+        return any(self.xy_wing_at(cell) for cell in range(81)
+                   if POPCOUNT[self.candidates[cell]] == 2)
+
+
+def test_matches_full_rescan():
+    for seed in range(80):
+        puzzle = Sudoku_Engine(np.random.default_rng(seed)).generate()
+        for difficulty, grid in puzzle.grids.items():
+            incremental = Sudoku_Grader(grid).grade()
+            full = Full_Rescan_Grader(grid).grade()
+            assert (incremental.rating, incremental.hardest) == (full.rating, full.hardest), \
+                (seed, difficulty)
+
+
+def test_rescans_pointing_box():
+    result = grade(line_to_grid(POINTING_TWICE))
+    assert result.solved
+    assert result.hardest == "Pointing"
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Regression tests of puzzle IDs: pinned seeds must keep their IDs and boards
+"""
+
+import hashlib
+
+import pytest
+
+from Sudoku_Engine import (GENERATOR_VERSION, grid_to_line, parse_puzzle_id, puzzle_from_id,
+                           puzzle_from_seed, puzzle_id)
+
+# (seed, difficulty) -> ID and digest of the board it regenerates, see board_digest.
+# These only change with GENERATOR_VERSION, update them together
+PINNED_IDS = {
+    (0, "Easy"): ("2E-0", "65bfd8d58dd67887"),
+    (1, "Medium"): ("2M-1", "f435a7cb5e73e17a"),
+    (2, "Hard"): ("2H-2", "ccac5fc721a02438"),
+    (20261018, None): ("2A-KAA4T", "3c483715cb31f438"),
+    (2**63 - 1, "Hard"): ("2H-7ZZZZZZZZZZZZ", "7f65113b0f2aae78"),
+}
+# Malformed IDs parse_puzzle_id must reject: empty seed, U not in the alphabet,
+# no version, a signed version and an unknown difficulty letter
+INVALID_IDS = ("2H-", "2H-U", "H-1", "+2H-2", "2X-1")
+
+
+def board_digest(puzzle, difficulty):
+    """
+    Short blake2b digest of a puzzle line and its solution, for PINNED_IDS
+    """
+    line = puzzle.line(difficulty or "Hard") + "," + grid_to_line(puzzle.solution)
+    return hashlib.blake2b(line.encode(), digest_size=8).hexdigest()
+
+
+@pytest.mark.parametrize("seed, difficulty", PINNED_IDS)
+def test_pinned_id(seed, difficulty):
+    pinned, digest = PINNED_IDS[seed, difficulty]
+    assert puzzle_id(seed, difficulty) == pinned
+    assert parse_puzzle_id(pinned) == (GENERATOR_VERSION, seed, difficulty)
+    # A different board means generation changed: bump GENERATOR_VERSION and PINNED_IDS
+    assert board_digest(puzzle_from_id(pinned), difficulty) == digest
+
+
+@pytest.mark.parametrize("seed, difficulty", [(3, "Easy"), (4, "Medium"), (5, "Hard"), (6, None)])
+def test_round_trip(seed, difficulty):
+    puzzle = puzzle_from_seed(seed, difficulty)
+    again = puzzle_from_id(puzzle.id)
+    assert again.id == puzzle.id
+    assert again.solution == puzzle.solution
+    assert again.grids == puzzle.grids
+
+
+@pytest.mark.parametrize("invalid", INVALID_IDS)
+def test_invalid_id(invalid):
+    with pytest.raises(ValueError):
+        parse_puzzle_id(invalid)
+
+
+def test_old_version():
+    with pytest.raises(ValueError, match="version 1"):
+        puzzle_from_id("1H-2")
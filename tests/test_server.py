@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the service's pool workers
+"""
+
+from Sudoku_Format import line_to_grid
+from Sudoku_Server import check_grids, solve_status
+
+# Sparse grid with several solutions, the solver visits about 130,000 nodes to find a second one
+SPARSE = "...8....3...6.......3....98..29.......1......3......57..6.7.........9..2....3..7."
+
+
+def test_check_grids_budget():
+    grid = line_to_grid(SPARSE)
+    (valid, solutions, solution), = check_grids([grid], budget=1000)
+    assert valid
+    assert solutions is None
+    assert solve_status(solutions) == "unfinished"
+    (_, solutions, solution), = check_grids([grid])
+    assert solve_status(solutions) == "multiple"
+    assert solution is not None
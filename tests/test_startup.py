@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Startup budget tests: the entry point modules must import quickly, the command
+line without tkinter and the GUI before numpy
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Entry point modules: import time budget in ms and modules they must not load,
+# the command line runs without tkinter and the GUI shows before numpy loads
+STARTUP_BUDGETS = {
+    "Sudoku_Engine": (250, ("tkinter",)),
+    "Sudoku_Generator": (100, ("numpy", "Sudoku_Engine")),
+}
+# Run in a fresh interpreter: prints the import time, then every loaded module
+STARTUP_SCRIPT = ("import sys, time; start = time.perf_counter(); import {module}; "
+                  "print(time.perf_counter() - start); print(' '.join(sys.modules))")
+# Imports per module, the fastest is checked against the budget
+REPEATS = 5
+
+
+def import_module(module):
+    """
+    Imports module in a fresh interpreter
+
+    Returns
+    -------
+    seconds : Float
+      Import time.
+    modules : Set of strings
+      Every module loaded by then.
+
+    """
+    result = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT.format(module=module)],
+                            capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if result.returncode != 0:
+        if "tkinter" in result.stderr:
+            pytest.skip("tkinter is not installed")
+        pytest.fail(f'{module} failed to import:\n{result.stderr}')
+    seconds, modules = result.stdout.splitlines()[:2]
+    return float(seconds), set(modules.split())
+
+
+@pytest.mark.parametrize("module", STARTUP_BUDGETS)
+def test_startup(module):
+    budget_ms, forbidden = STARTUP_BUDGETS[module]
+    imports = [import_module(module) for _ in range(REPEATS)]
+    loaded = [name for name in forbidden if name in imports[0][1]]
+    assert not loaded, f'{module} loads {", ".join(loaded)}'
+    import_ms = min(seconds for seconds, _ in imports) * 1000
+    assert import_ms <= budget_ms, f'{module} import {import_ms:.1f} ms, budget {budget_ms} ms'